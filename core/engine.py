@@ -49,7 +49,7 @@ def run():
                     progress = 0.0
                     if runner.runtime.max_steps > 0:
                         progress = min(1.0, runner.runtime.agent_steps / float(runner.runtime.max_steps))
-                    ui.print_runtime_meter(runner.runtime.get_stats(), progress=progress)
+                    ui.print_runtime_meter(runner.runtime.get_stats(), progress=progress, force=True)
                 elif action == "doctor":
                     for line in result.get("lines") or []:
                         ui.print_system(line)
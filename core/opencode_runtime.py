@@ -328,4 +328,4 @@ class RichConsoleHook:
         if t == "runtime.finished":
             stats = p.get("stats", {})
             if isinstance(stats, dict):
-                self.ui.print_runtime_meter(stats, progress=self._progress())
+                self.ui.print_runtime_meter(stats, progress=self._progress(), force=True)
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
+import bisect
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
 import os
 from pathlib import Path
 import threading
 import time
-from typing import Any
+from typing import Any, Callable
 
 from rich.console import Group
 from rich.markdown import Markdown
+from rich.style import Style
 from rich.syntax import Syntax
 from rich.text import Text
 
@@ -24,6 +27,19 @@ class _RuntimePayload:
     payload: dict[str, Any]
 
 
+# Pre-parsed styles for the per-event timeline lines.
+_STYLE_GUTTER = Style.parse("bright_black")
+_STYLE_DIM = Style.parse("dim")
+_STYLE_DIM_CYAN = Style.parse("dim cyan")
+
+
+def _join_chunks(chunks: list[str]) -> str:
+    # Collapse to the joined string so the next join only covers new tokens.
+    if len(chunks) > 1:
+        chunks[:] = ["".join(chunks)]
+    return chunks[0] if chunks else ""
+
+
 class RuntimeRelay:
     def __init__(self, app: "AgentTUIApp"):
         self.app = app
@@ -72,6 +88,23 @@ class AgentTUIApp(App):
         "    │                    /____/ nt     │",
         "    ╰─────────────────────────────────╯",
     ]
+    COMMAND_DESCRIPTIONS = {
+        "/help": "查看命令帮助",
+        "/provider [name]": "切换 provider",
+        "/providers": "列出 provider",
+        "/model [name]": "切换模型",
+        "/build [fast|balanced|deep]": "切换构建模式",
+        "/approve [on|off]": "风险操作自动审批",
+        "/sessions": "查看会话列表",
+        "/session [id]": "切换会话",
+        "/new": "创建新会话",
+        "/themes": "列出主题",
+        "/theme [name]": "切换主题",
+        "/doctor [provider]": "诊断 API Key 和 .env",
+        "/stats": "显示统计",
+        "/clear": "清屏",
+        "/exit": "退出",
+    }
     CSS = """
     Screen {
         layout: vertical;
@@ -213,11 +246,12 @@ class AgentTUIApp(App):
     def __init__(self, *, compact: bool = False):
         super().__init__()
         self.runner = AgentRunner(auto_approve_risky=True)
-        self._assistant_buffer = ""
-        self._reasoning_buffer = ""
+        self._assistant_chunks: list[str] = []
+        self._reasoning_chunks: list[str] = []
         self._live_mode = ""
         self._timeline: list[Any] = []
         self._last_stream_paint_at = 0.0
+        self._preview_seq = 0
 
         self._flow_active = False
         self._flow_label = "idle"
@@ -229,6 +263,10 @@ class AgentTUIApp(App):
         self._drawer_target_width = 0
         self._drawer_max_width = 44
         self._drawer_step = 4
+        self._last_compact_applied: bool | None = None
+        self._last_drawer_render: tuple[bool, int, int] | None = None
+        self._drawer_version = 0
+        self._drawer_cache: tuple[int, str] = (-1, "")
         self._use_textarea = TextArea is not None
         self._input_history: list[str] = []
         self._history_index = -1
@@ -238,8 +276,22 @@ class AgentTUIApp(App):
         self._slash_items: list[str] = []
         self._slash_selected = 0
         self._slash_max_rows = 8
+        self._slash_header_cached: Text | None = None
+        self._slash_item_texts: list[Text] = []
+        self._slash_texts_items: list[str] | None = None
+        self._slash_texts_selected = -1
+        self._last_slash_render_key: tuple[Any, ...] | None = None
         self._last_prompt_text = ""
-        self._recent_slash_commands: list[str] = []
+        # Most-recent-first LRU of submitted slash commands (values unused).
+        self._recent_slash_commands: OrderedDict[str, None] = OrderedDict()
+        # Filled off the UI thread by _refresh_sessions_snapshot; read-only elsewhere.
+        self._saved_sessions_snapshot: list[dict[str, Any]] = []
+        self._suggestions_cache: list[str] | None = None
+        self._suggestions_dirty = True
+        self._suggestions_lower: list[str] = []
+        self._suggestions_sorted_lower: list[str] = []
+        self._suggestions_sorted_pos: list[int] = []
+        self._slash_last_query: tuple[str, list[str]] | None = None
         self._hot_slash_commands = [
             "/help",
             "/sessions",
@@ -250,6 +302,7 @@ class AgentTUIApp(App):
             "/approve on",
         ]
         self._collapsed_tool_results: dict[int, tuple[str, bool]] = {}
+        self._msg_renderable_cache: dict[tuple[str, str, int], Any] = {}
         self._last_collapsed_tool_index: int = -1
         self._reasoning_started_at = 0.0
         self._last_reasoning_full = ""
@@ -261,9 +314,50 @@ class AgentTUIApp(App):
         self._scanner_pos = 0
         self._scanner_dir = 1
         self._dialog_stack: list[tuple[str, str]] = []
+        self._last_session_key: tuple[Any, ...] | None = None
+        self._last_usage_key: tuple[Any, ...] | None = None
+        self._last_stage_key: tuple[Any, ...] | None = None
+        self._last_progress_pct = -1
+        # Widget handles, resolved once in on_mount (see _cache_widgets).
+        self._w_prompt: Any = None
+        self._w_slash: Any = None
+        self._w_drawer: Any = None
+        self._w_status: Any = None
+        self._w_flow_text: Any = None
+        self._w_flow_loader: Any = None
+        self._w_live: Any = None
+        self._w_chat_log: Any = None
+        self._w_session: Any = None
+        self._w_usage: Any = None
+        self._w_stage: Any = None
+        self._w_progress: Any = None
+        self._status_static: Text | None = None
+        self._dirty_status = True
+        self._dirty_side = False
+        self._dirty_drawer = False
         self._status_mcp = os.getenv("AI_MCP_STATUS", "offline")
         self._status_lsp = os.getenv("AI_LSP_STATUS", "idle")
         self._app_version = os.getenv("AI_AGENT_VERSION", "v1.0")
+        self._event_handlers: dict[str, Callable[[dict[str, Any]], None]] = {
+            "turn.user": self._on_turn_user,
+            "status.stage": self._on_status_stage,
+            "status.clear": self._on_status_clear,
+            "assistant.reasoning.start": self._on_reasoning_start,
+            "assistant.reasoning.token": self._on_reasoning_token,
+            "assistant.reasoning.end": self._on_reasoning_end,
+            "assistant.stream.start": self._on_stream_start,
+            "assistant.stream.token": self._on_stream_token,
+            "assistant.stream.end": self._on_stream_end,
+            "system.message": self._on_system_message,
+            "tool.call": self._on_tool_call,
+            "tool.result": self._on_tool_result,
+            "tool.plan": self._on_tool_plan,
+            "session.switched": self._on_session_switched,
+            "runtime.provider.changed": self._on_runtime_changed,
+            "runtime.model.changed": self._on_runtime_changed,
+            "runtime.mode.changed": self._on_runtime_changed,
+            "runtime.theme.changed": self._on_theme_changed,
+        }
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
@@ -290,7 +384,23 @@ class AgentTUIApp(App):
             yield Static(id="dialog_panel")
         yield Footer()
 
+    def _cache_widgets(self) -> None:
+        # The widget tree is fixed after compose, so hot paths skip the DOM query.
+        self._w_prompt = self.query_one("#prompt_input")
+        self._w_slash = self.query_one("#slash_panel", Static)
+        self._w_drawer = self.query_one("#command_drawer", Static)
+        self._w_status = self.query_one("#status_bar", Static)
+        self._w_flow_text = self.query_one("#flow_text", Static)
+        self._w_flow_loader = self.query_one("#flow_loader", Static)
+        self._w_live = self.query_one("#live_stream", Static)
+        self._w_chat_log = self.query_one("#chat_log", RichLog)
+        self._w_session = self.query_one("#session_info", Static)
+        self._w_usage = self.query_one("#usage_info", Static)
+        self._w_stage = self.query_one("#stage_info", Static)
+        self._w_progress = self.query_one("#progress", ProgressBar)
+
     def on_mount(self) -> None:
+        self._cache_widgets()
         self.runner.on(RuntimeRelay(self).handle)
         self.runner.resume_history(resume=True)
         self._apply_theme(force=True)
@@ -302,10 +412,15 @@ class AgentTUIApp(App):
         self._render_command_drawer()
         self._refresh_slash_panel(force=True)
         self.set_interval(0.08, self._tick_ui)
+        self.set_interval(0.4, self._tick_side)
         self._apply_compact_layout()
         self._focus_prompt()
+        self._refresh_sessions_snapshot()
 
     def _apply_compact_layout(self) -> None:
+        if self._last_compact_applied == self._compact_mode:
+            return
+        self._last_compact_applied = self._compact_mode
         side = self.query_one("#side-pane", Vertical)
         side.display = not self._compact_mode
         if self._compact_mode:
@@ -343,52 +458,63 @@ class AgentTUIApp(App):
         if (not force) and active == self._theme:
             return
         self._theme = active
+        self._invalidate_side_cache()
+        self._dirty_status = True
+        self._slash_header_cached = None
+        self._slash_texts_items = None
+        self._last_slash_render_key = None
+        self._last_drawer_render = None
         t = self._theme_tui()
-        self.styles.background = t["screen_bg"]
-
-        chat = self.query_one("#chat-pane", Vertical)
-        chat.styles.background = t["chat_bg"]
-        chat.styles.border = ("heavy", t["panel_primary"])
-
-        side = self.query_one("#side-pane", Vertical)
-        side.styles.background = t["side_bg"]
-        side.styles.border = ("heavy", t["panel_secondary"])
-
-        drawer = self.query_one("#command_drawer", Static)
-        drawer.styles.background = t["drawer_bg"]
-        drawer.styles.border = ("heavy", t["panel_primary"])
-
-        live = self.query_one("#live_stream", Static)
-        live.styles.background = t["live_bg"]
-        live.styles.border_bottom = ("hkey", t["panel_muted"])
-
-        flow_loader = self.query_one("#flow_loader", Static)
-        flow_loader.styles.border_bottom = ("hkey", t["panel_muted"])
-        flow_text = self.query_one("#flow_text", Static)
-        flow_text.styles.color = t["text_soft"]
-        flow_text.styles.background = t["side_bg"]
-        chat_log = self.query_one("#chat_log", RichLog)
-        chat_log.styles.color = t["text_primary"]
-        progress = self.query_one("#progress", ProgressBar)
-        progress.styles.color = t["accent_a"]
-
-        prompt = self.query_one("#prompt_input")
-        prompt.styles.background = t["drawer_bg"]
-        prompt.styles.color = t["text_primary"]
-        prompt.styles.border = ("heavy", t["panel_secondary"])
-
-        slash = self.query_one("#slash_panel", Static)
-        slash.styles.background = t["chat_bg"]
-        slash.styles.border = ("heavy", t["panel_secondary"])
-
-        status_bar = self.query_one("#status_bar", Static)
-        status_bar.styles.background = t["side_bg"]
-        status_bar.styles.border_top = ("hkey", t["panel_muted"])
-        status_bar.styles.color = t["text_dim"]
-
-        panel = self.query_one("#dialog_panel", Static)
-        panel.styles.background = t["chat_bg"]
-        panel.styles.border = ("heavy", t["panel_primary"])
+        border_primary = ("heavy", t["panel_primary"])
+        border_secondary = ("heavy", t["panel_secondary"])
+        rule_muted = ("hkey", t["panel_muted"])
+
+        with self.batch_update():
+            self.styles.background = t["screen_bg"]
+
+            chat = self.query_one("#chat-pane", Vertical)
+            chat.styles.background = t["chat_bg"]
+            chat.styles.border = border_primary
+
+            side = self.query_one("#side-pane", Vertical)
+            side.styles.background = t["side_bg"]
+            side.styles.border = border_secondary
+
+            drawer = self._w_drawer
+            drawer.styles.background = t["drawer_bg"]
+            drawer.styles.border = border_primary
+
+            live = self._w_live
+            live.styles.background = t["live_bg"]
+            live.styles.border_bottom = rule_muted
+
+            flow_loader = self._w_flow_loader
+            flow_loader.styles.border_bottom = rule_muted
+            flow_text = self._w_flow_text
+            flow_text.styles.color = t["text_soft"]
+            flow_text.styles.background = t["side_bg"]
+            chat_log = self._w_chat_log
+            chat_log.styles.color = t["text_primary"]
+            progress = self._w_progress
+            progress.styles.color = t["accent_a"]
+
+            prompt = self._w_prompt
+            prompt.styles.background = t["drawer_bg"]
+            prompt.styles.color = t["text_primary"]
+            prompt.styles.border = border_secondary
+
+            slash = self._w_slash
+            slash.styles.background = t["chat_bg"]
+            slash.styles.border = border_secondary
+
+            status_bar = self._w_status
+            status_bar.styles.background = t["side_bg"]
+            status_bar.styles.border_top = rule_muted
+            status_bar.styles.color = t["text_dim"]
+
+            panel = self.query_one("#dialog_panel", Static)
+            panel.styles.background = t["chat_bg"]
+            panel.styles.border = border_primary
 
     def _scanner_text(self, width: int = 22) -> Text:
         t = self._theme_tui()
@@ -407,16 +533,12 @@ class AgentTUIApp(App):
                 out.append("━", style=t["panel_muted"])
         return out
 
-    def _refresh_status_bar(self) -> None:
+    def _build_status_static(self) -> Text:
         t = self._theme_tui()
-        bar = self.query_one("#status_bar", Static)
-        spinner = self._spinner_frames[self._spinner_idx % len(self._spinner_frames)]
         cwd = str(Path.cwd())
         cwd_short = cwd if len(cwd) <= 30 else ("..." + cwd[-27:])
-        scanner = self._scanner_text(20)
 
         status = Text()
-        status.append(f"{spinner} ", style=f"bold {t['accent_a']}")
         status.append(cwd_short, style=t["text_dim"])
         status.append("  ", style="dim")
 
@@ -441,7 +563,22 @@ class AgentTUIApp(App):
         status.append("  ", style="dim")
         status.append(f"{self._app_version}", style=t["text_dim"])
         status.append("  ", style="dim")
-        status.append_text(scanner)
+        return status
+
+    def _refresh_status_bar(self) -> None:
+        # Only the spinner and scanner move per tick; the cwd/mcp/lsp/theme
+        # segment is rebuilt when marked dirty.
+        if self._dirty_status or self._status_static is None:
+            self._status_static = self._build_status_static()
+            self._dirty_status = False
+        t = self._theme_tui()
+        bar = self._w_status
+        spinner = self._spinner_frames[self._spinner_idx % len(self._spinner_frames)]
+
+        status = Text()
+        status.append(f"{spinner} ", style=f"bold {t['accent_a']}")
+        status.append_text(self._status_static)
+        status.append_text(self._scanner_text(20))
         bar.update(status)
 
     def _dialog_is_open(self) -> bool:
@@ -476,16 +613,16 @@ class AgentTUIApp(App):
         self._render_dialog()
 
     def _focus_prompt(self) -> None:
-        widget = self.query_one("#prompt_input")
+        widget = self._w_prompt
         widget.focus()
 
     def _chat_write(self, text: str | Text) -> None:
         if not text:
             return
-        self.query_one("#chat_log", RichLog).write(text)
+        self._w_chat_log.write(text)
 
     def _rerender_chat_log(self) -> None:
-        log = self.query_one("#chat_log", RichLog)
+        log = self._w_chat_log
         log.clear()
         for item in self._timeline:
             log.write(item)
@@ -527,6 +664,22 @@ class AgentTUIApp(App):
             logo.append(line + "\n", style=f"bold {color}")
         return logo
 
+    def _build_message_renderable(self, role: str, name: str, content: str) -> Any:
+        if role == "user":
+            badge = Text()
+            badge.append(" YOU ", style="bold black on yellow")
+            badge.append(f"  {content}", style="white")
+            return badge
+        if role == "assistant":
+            badge = Text()
+            badge.append(" ASSISTANT ", style="bold black on cyan")
+            return Group(badge, Text(), Markdown(content))
+        text = content[:500] + ("... (truncated)" if len(content) > 500 else "")
+        badge = Text()
+        badge.append(" TOOL ", style="bold black on bright_magenta")
+        badge.append(f"  {name}", style="bright_magenta")
+        return Group(badge, Text(), Text(text, style="dim"))
+
     def _render_messages_from_runner(self) -> None:
         self._timeline = []
         self._collapsed_tool_results = {}
@@ -557,35 +710,40 @@ class AgentTUIApp(App):
         self._timeline_append(keys)
         self._timeline_append("")
 
+        cache = self._msg_renderable_cache
+        live_keys: set[tuple[str, str, int]] = set()
         for msg in self.runner.messages:
             role = str(msg.get("role", ""))
             content = str(msg.get("content", "") or "").strip()
-            if role == "user" and content:
-                badge = Text()
-                badge.append(" YOU ", style="bold black on yellow")
-                badge.append(f"  {content}", style="white")
-                self._timeline_append_message("you", badge)
-            elif role == "assistant" and content:
-                badge = Text()
-                badge.append(" ASSISTANT ", style="bold black on cyan")
-                self._timeline_append_message("assistant", Group(badge, Text(), Markdown(content)))
-            elif role == "tool":
+            if role == "tool":
                 name = str(msg.get("name", "tool"))
-                text = content[:500] + ("... (truncated)" if len(content) > 500 else "")
-                badge = Text()
-                badge.append(" TOOL ", style="bold black on bright_magenta")
-                badge.append(f"  {name}", style="bright_magenta")
-                self._timeline_append_message(f"tool[{name}]", Group(badge, Text(), Text(text, style="dim")))
+                label = f"tool[{name}]"
+            elif role in {"user", "assistant"} and content:
+                name = ""
+                label = "you" if role == "user" else "assistant"
+            else:
+                continue
+            key = (role, name, hash(content))
+            live_keys.add(key)
+            renderable = cache.get(key)
+            if renderable is None:
+                renderable = self._build_message_renderable(role, name, content)
+                cache[key] = renderable
+            self._timeline_append_message(label, renderable)
+        for stale in [k for k in cache if k not in live_keys]:
+            del cache[stale]
         self._rerender_chat_log()
         self._clear_live_stream()
 
+    def _invalidate_side_cache(self) -> None:
+        self._last_session_key = None
+        self._last_usage_key = None
+        self._last_stage_key = None
+        self._last_progress_pct = -1
+
     def _refresh_side(self) -> None:
         t = self._theme_tui()
         stats = self.runner.runtime.get_stats()
-        session = self.query_one("#session_info", Static)
-        usage = self.query_one("#usage_info", Static)
-        stage = self.query_one("#stage_info", Static)
-        progress = self.query_one("#progress", ProgressBar)
 
         self._usage_target["prompt"] = int(stats.get("prompt_tokens", 0) or 0)
         self._usage_target["completion"] = int(stats.get("completion_tokens", 0) or 0)
@@ -595,61 +753,87 @@ class AgentTUIApp(App):
         pct = 0
         if self.runner.runtime.max_steps > 0:
             pct = int(min(100, max(0, round((self.runner.runtime.agent_steps / self.runner.runtime.max_steps) * 100))))
-        progress.update(progress=pct)
+        if pct != self._last_progress_pct:
+            self._last_progress_pct = pct
+            self._w_progress.update(progress=pct)
 
         # Session panel with structured layout
-        sess_text = Text()
-        sess_text.append("SESSION\n", style=f"bold {t['accent_a']}")
-        sess_text.append("id       ", style="dim")
-        sess_text.append(f"{stats.get('session_id', '')[:14]}\n", style=t["text_soft"])
-        sess_text.append("provider ", style="dim")
-        sess_text.append(f"{self.runner.provider_name}\n", style="magenta")
-        sess_text.append("model    ", style="dim")
-        sess_text.append(f"{self.runner.model_name}\n", style=t["accent_a"])
-        sess_text.append("build    ", style="dim")
-        sess_text.append(f"{self.runner.build_mode}\n", style="yellow")
-        sess_text.append("turn ", style="dim")
-        sess_text.append(f"{stats.get('turns', 0)}", style="white")
-        sess_text.append("  step ", style="dim")
-        sess_text.append(f"{stats.get('steps', 0)}", style="white")
-        sess_text.append("  tool ", style="dim")
-        sess_text.append(f"{stats.get('tool_calls', 0)}", style="white")
         failures = stats.get("tool_failures", 0)
-        if failures:
-            sess_text.append("  err ", style="dim")
-            sess_text.append(f"{failures}", style="bold red")
-        session.update(sess_text)
+        session_key = (
+            str(stats.get("session_id", ""))[:14],
+            self.runner.provider_name,
+            self.runner.model_name,
+            self.runner.build_mode,
+            self._theme_name,
+            stats.get("turns", 0),
+            stats.get("steps", 0),
+            stats.get("tool_calls", 0),
+            failures,
+        )
+        if session_key != self._last_session_key:
+            self._last_session_key = session_key
+            sess_text = Text()
+            sess_text.append("SESSION\n", style=f"bold {t['accent_a']}")
+            sess_text.append("id       ", style="dim")
+            sess_text.append(f"{session_key[0]}\n", style=t["text_soft"])
+            sess_text.append("provider ", style="dim")
+            sess_text.append(f"{self.runner.provider_name}\n", style="magenta")
+            sess_text.append("model    ", style="dim")
+            sess_text.append(f"{self.runner.model_name}\n", style=t["accent_a"])
+            sess_text.append("build    ", style="dim")
+            sess_text.append(f"{self.runner.build_mode}\n", style="yellow")
+            sess_text.append("turn ", style="dim")
+            sess_text.append(f"{stats.get('turns', 0)}", style="white")
+            sess_text.append("  step ", style="dim")
+            sess_text.append(f"{stats.get('steps', 0)}", style="white")
+            sess_text.append("  tool ", style="dim")
+            sess_text.append(f"{stats.get('tool_calls', 0)}", style="white")
+            if failures:
+                sess_text.append("  err ", style="dim")
+                sess_text.append(f"{failures}", style="bold red")
+            self._w_session.update(sess_text)
 
         # Usage panel with visual counters
-        usage_text = Text()
-        usage_text.append("USAGE\n", style=f"bold {t['accent_a']}")
-        usage_text.append("prompt   ", style="dim")
-        usage_text.append(f"{self._usage_display['prompt']}\n", style=t["accent_b"])
-        usage_text.append("compl    ", style="dim")
-        usage_text.append(f"{self._usage_display['completion']}\n", style=t["accent_good"])
-        usage_text.append("total    ", style="dim")
-        usage_text.append(f"{self._usage_display['total']}\n", style="bold white")
-        usage_text.append("cost     ", style="dim")
-        usage_text.append(f"${self._usage_display['cost']:.4f}", style=t["accent_warn"])
-        usage.update(usage_text)
+        usage_key = (
+            self._usage_display["prompt"],
+            self._usage_display["completion"],
+            self._usage_display["total"],
+            round(self._usage_display["cost"], 4),
+        )
+        if usage_key != self._last_usage_key:
+            self._last_usage_key = usage_key
+            usage_text = Text()
+            usage_text.append("USAGE\n", style=f"bold {t['accent_a']}")
+            usage_text.append("prompt   ", style="dim")
+            usage_text.append(f"{usage_key[0]}\n", style=t["accent_b"])
+            usage_text.append("compl    ", style="dim")
+            usage_text.append(f"{usage_key[1]}\n", style=t["accent_good"])
+            usage_text.append("total    ", style="dim")
+            usage_text.append(f"{usage_key[2]}\n", style="bold white")
+            usage_text.append("cost     ", style="dim")
+            usage_text.append(f"${usage_key[3]:.4f}", style=t["accent_warn"])
+            self._w_usage.update(usage_text)
 
         # Stage with spinner
         spin = self._spinner_frames[self._spinner_idx % len(self._spinner_frames)]
-        stage_text = Text()
-        stage_text.append("STAGE\n", style=f"bold {t['accent_a']}")
-        stage_text.append(f"{spin} ", style=f"bold {t['accent_a']}")
-        stage_text.append(f"{self._flow_label}", style=t["text_soft"])
-        if self._flow_detail:
-            stage_text.append(f"\n  {self._flow_detail}", style="dim")
-        stage.update(stage_text)
+        stage_key = (spin, self._flow_label, self._flow_detail)
+        if stage_key != self._last_stage_key:
+            self._last_stage_key = stage_key
+            stage_text = Text()
+            stage_text.append("STAGE\n", style=f"bold {t['accent_a']}")
+            stage_text.append(f"{spin} ", style=f"bold {t['accent_a']}")
+            stage_text.append(f"{self._flow_label}", style=t["text_soft"])
+            if self._flow_detail:
+                stage_text.append(f"\n  {self._flow_detail}", style="dim")
+            self._w_stage.update(stage_text)
 
     def _set_live_stream(self, renderable: Any) -> None:
-        widget = self.query_one("#live_stream", Static)
+        widget = self._w_live
         widget.display = True
         widget.update(renderable)
 
     def _clear_live_stream(self) -> None:
-        widget = self.query_one("#live_stream", Static)
+        widget = self._w_live
         widget.update("")
         widget.display = False
 
@@ -663,11 +847,12 @@ class AgentTUIApp(App):
         cursor = "▍" if (self._flow_phase % 6 < 3) else " "
         if self._live_mode == "reasoning":
             # Show last ~600 chars of reasoning for preview
-            preview = self._reasoning_buffer[-600:] if len(self._reasoning_buffer) > 600 else self._reasoning_buffer
+            buffer = _join_chunks(self._reasoning_chunks)
+            preview = buffer[-600:] if len(buffer) > 600 else buffer
             header = Text()
             header.append(" THINKING ", style="bold black on bright_black")
             elapsed = time.monotonic() - self._reasoning_started_at
-            header.append(f"  {elapsed:.1f}s  {len(self._reasoning_buffer)} chars", style="dim")
+            header.append(f"  {elapsed:.1f}s  {len(buffer)} chars", style="dim")
             self._set_live_stream(
                 Group(
                     header,
@@ -677,23 +862,33 @@ class AgentTUIApp(App):
             return
         if self._live_mode == "assistant":
             # Show last ~800 chars of assistant stream
-            preview = self._assistant_buffer[-800:] if len(self._assistant_buffer) > 800 else self._assistant_buffer
+            buffer = _join_chunks(self._assistant_chunks)
+            preview = buffer[-800:] if len(buffer) > 800 else buffer
             header = Text()
             header.append(" ASSISTANT ", style=f"bold black on {t['accent_a']}")
-            header.append(f"  streaming  {len(self._assistant_buffer)} chars", style="dim")
-            self._set_live_stream(
-                Group(
-                    header,
-                    Markdown(preview + cursor),
-                )
-            )
+            header.append(f"  streaming  {len(buffer)} chars", style="dim")
+            self._preview_seq += 1
+            self._preview_worker(self._preview_seq, header, preview + cursor)
             return
+        self._preview_seq += 1
         self._clear_live_stream()
 
+    @work(thread=True, exclusive=True, group="md_preview")
+    def _preview_worker(self, seq: int, header: Text, text: str) -> None:
+        # Markdown parses eagerly in its constructor, so build it off the UI thread.
+        markdown = Markdown(text)
+        self.call_from_thread(self._apply_stream_preview, seq, Group(header, markdown))
+
+    def _apply_stream_preview(self, seq: int, renderable: Any) -> None:
+        # Drop results that were overtaken by a newer paint or by stream end.
+        if seq != self._preview_seq or self._live_mode != "assistant":
+            return
+        self._set_live_stream(renderable)
+
     def _refresh_flow_visuals(self) -> None:
         t = self._theme_tui()
-        text_widget = self.query_one("#flow_text", Static)
-        bar_widget = self.query_one("#flow_loader", Static)
+        text_widget = self._w_flow_text
+        bar_widget = self._w_flow_loader
 
         steps = int(self.runner.runtime.agent_steps)
         max_steps = max(1, int(self.runner.runtime.max_steps))
@@ -810,31 +1005,29 @@ class AgentTUIApp(App):
         self._collapsed_tool_results[idx] = (rendered, is_diff)
         self._last_collapsed_tool_index = idx
 
-    def _animate_int(self, key: str) -> None:
-        target = int(self._usage_target[key])
-        current = int(self._usage_display[key])
-        if current == target:
-            return
-        delta = target - current
-        step = max(1, int(abs(delta) * 0.25))
-        self._usage_display[key] = current + (step if delta > 0 else -step)
-        if (delta > 0 and self._usage_display[key] > target) or (delta < 0 and self._usage_display[key] < target):
-            self._usage_display[key] = target
-
     def _animate_usage_numbers(self) -> None:
-        self._animate_int("prompt")
-        self._animate_int("completion")
-        self._animate_int("total")
-        cost_target = float(self._usage_target["cost"])
-        cost_current = float(self._usage_display["cost"])
-        if abs(cost_target - cost_current) < 0.00001:
-            self._usage_display["cost"] = cost_target
+        display = self._usage_display
+        target = self._usage_target
+        if display == target:
+            return
+        for key in ("prompt", "completion", "total"):
+            current = display[key]
+            delta = target[key] - current
+            if delta:
+                # Integer step sized so a jump settles within ~6 ticks (~500 ms).
+                step = max(1, abs(delta) // 6)
+                display[key] = current + step if delta > 0 else current - step
+        cost_target = target["cost"]
+        cost_current = display["cost"]
+        if abs(cost_target - cost_current) < 0.0001:
+            display["cost"] = cost_target
         else:
-            # Exponential easing for smooth UI counter motion.
-            self._usage_display["cost"] = cost_current + (cost_target - cost_current) * 0.24
+            display["cost"] = cost_current + (cost_target - cost_current) / 6
 
     def _build_suggestions(self) -> list[str]:
-        base = list(self.runner.slash_commands())
+        if not self._suggestions_dirty and self._suggestions_cache is not None:
+            return self._suggestions_cache
+        base = self.runner.slash_commands()
         extra = [
             "/build fast",
             "/build balanced",
@@ -846,28 +1039,27 @@ class AgentTUIApp(App):
             "/doctor",
             f"/model {self.runner.model_name}",
         ]
-        for p in list_providers():
-            extra.append(f"/provider {p}")
-        for theme_name in list_theme_names():
-            extra.append(f"/theme {theme_name}")
-        for item in list_saved_chat_sessions(limit=30):
-            sid = str(item.get("session_id", "")).strip()
-            if sid:
-                extra.append(f"/session {sid}")
-
-        seen: set[str] = set()
-        ordered: list[str] = []
-        for cmd in self._recent_slash_commands + self._hot_slash_commands + base + extra:
-            c = cmd.strip()
-            if not c or c in seen:
-                continue
-            seen.add(c)
-            ordered.append(c)
+        providers = [f"/provider {p}" for p in list_providers()]
+        themes = [f"/theme {theme_name}" for theme_name in list_theme_names()]
+        session_ids = (str(item.get("session_id", "")).strip() for item in self._saved_sessions_snapshot[:30])
+        sessions = [f"/session {sid}" for sid in session_ids if sid]
+
+        # dict keeps first-seen order, so one hash lookup per entry both dedups and orders.
+        merged: dict[str, None] = {}
+        for source in (self._recent_slash_commands, self._hot_slash_commands, base, extra, providers, themes, sessions):
+            for cmd in source:
+                c = cmd.strip()
+                if c:
+                    merged.setdefault(c, None)
+        ordered = list(merged)
+        self._suggestions_cache = ordered
+        self._suggestions_dirty = False
+        self._rebuild_slash_index(ordered)
         return ordered
 
     def _refresh_input_suggester(self) -> None:
         suggestions = self._build_suggestions()
-        widget = self.query_one("#prompt_input")
+        widget = self._w_prompt
         if isinstance(widget, Input):
             widget.suggester = SuggestFromList(suggestions, case_sensitive=False)
         elif self._use_textarea:
@@ -875,58 +1067,100 @@ class AgentTUIApp(App):
             return
 
     def _extract_prompt_command(self, raw_text: str) -> str:
-        text = (raw_text or "").strip()
+        text = (raw_text or "").rstrip()
         if not text:
             return ""
-        first_line = text.splitlines()[-1].strip()
-        if not first_line.startswith("/"):
+        last_line = text.rpartition("\n")[2].strip()
+        if not last_line.startswith("/"):
             return ""
-        return first_line
+        return last_line
+
+    def _rebuild_slash_index(self, items: list[str]) -> None:
+        # Sorted lowercase view for bisect prefix lookup; _suggestions_sorted_pos
+        # maps each sorted entry back to its position in the ranked list.
+        lowered = [item.lower() for item in items]
+        order = sorted(range(len(lowered)), key=lowered.__getitem__)
+        self._suggestions_lower = lowered
+        self._suggestions_sorted_lower = [lowered[i] for i in order]
+        self._suggestions_sorted_pos = order
+        self._slash_last_query = None
 
     def _matching_slash_items(self, command_text: str) -> list[str]:
         if not command_text.startswith("/"):
             return []
         all_items = self._build_suggestions()
         q = command_text.lower()
+        if self._slash_last_query is not None and self._slash_last_query[0] == q:
+            return list(self._slash_last_query[1])
         if q == "/":
-            return all_items[: self._slash_max_rows]
-        starts = [item for item in all_items if item.lower().startswith(q)]
-        if starts:
-            return starts[: self._slash_max_rows]
-        fuzzy = [item for item in all_items if q in item.lower()]
-        return fuzzy[: self._slash_max_rows]
+            result = all_items[: self._slash_max_rows]
+        else:
+            limit = self._slash_max_rows
+            sorted_lower = self._suggestions_sorted_lower
+            lo = bisect.bisect_left(sorted_lower, q)
+            hi = bisect.bisect_left(sorted_lower, q + "\U0010ffff", lo)
+            # Prefix hits are contiguous in sorted order; restore ranking (recent/hot first).
+            hits = sorted(self._suggestions_sorted_pos[lo:hi])[:limit]
+            result = [all_items[i] for i in hits]
+            if not result:
+                for item, low in zip(all_items, self._suggestions_lower):
+                    if q in low:
+                        result.append(item)
+                        if len(result) >= limit:
+                            break
+        self._slash_last_query = (q, result)
+        return list(result)
+
+    def _slash_item_text(self, item: str, selected: bool) -> Text:
+        t = self._theme_tui()
+        if selected:
+            return Text(f"  ▸ {item}", style=f"bold black on {t['accent_b']}")
+        return Text(f"    {item}", style=t["accent_a"])
 
     def _render_slash_panel(self) -> None:
-        panel = self.query_one("#slash_panel", Static)
+        key = (tuple(self._slash_items), self._slash_selected, self._slash_panel_visible)
+        if key == self._last_slash_render_key:
+            return
+        self._last_slash_render_key = key
+        panel = self._w_slash
         if not self._slash_panel_visible or not self._slash_items:
             panel.display = False
             panel.update("")
             return
 
-        t = self._theme_tui()
-        panel.display = True
-        header = Text()
-        header.append(" / ", style=f"bold black on {t['accent_a']}")
-        header.append("  Command Palette", style=f"bold {t['accent_a']}")
-        header.append("  Tab fill  ↑↓ select  Enter submit", style="dim")
-
-        lines_text = Text()
-        for i, item in enumerate(self._slash_items):
-            if i > 0:
-                lines_text.append("\n")
-            if i == self._slash_selected:
-                lines_text.append(f"  ▸ {item}", style=f"bold black on {t['accent_b']}")
-            else:
-                lines_text.append(f"    {item}", style=t["accent_a"])
+        if self._slash_header_cached is None:
+            t = self._theme_tui()
+            header = Text()
+            header.append(" / ", style=f"bold black on {t['accent_a']}")
+            header.append("  Command Palette", style=f"bold {t['accent_a']}")
+            header.append("  Tab fill  ↑↓ select  Enter submit", style="dim")
+            self._slash_header_cached = header
+
+        selected = self._slash_selected
+        texts = self._slash_item_texts
+        if self._slash_texts_items != self._slash_items:
+            # New match list: build every row once.
+            self._slash_texts_items = list(self._slash_items)
+            texts[:] = [self._slash_item_text(item, i == selected) for i, item in enumerate(self._slash_items)]
+        elif self._slash_texts_selected != selected:
+            # Selection moved: only the two affected rows change.
+            prev = self._slash_texts_selected
+            if 0 <= prev < len(texts):
+                texts[prev] = self._slash_item_text(self._slash_items[prev], False)
+            texts[selected] = self._slash_item_text(self._slash_items[selected], True)
+        self._slash_texts_selected = selected
 
-        from rich.console import Group as RGroup
-        panel.update(RGroup(header, lines_text))
+        panel.display = True
+        panel.update(Group(self._slash_header_cached, *texts))
 
     def _refresh_slash_panel(self, force: bool = False) -> None:
         prompt = self._prompt_get_value()
         if not force and prompt == self._last_prompt_text:
             return
         self._last_prompt_text = prompt
+        if not self._slash_panel_visible and "/" not in prompt:
+            # Plain text with the panel already hidden: nothing to match or repaint.
+            return
 
         cmd = self._extract_prompt_command(prompt)
         items = self._matching_slash_items(cmd)
@@ -956,29 +1190,21 @@ class AgentTUIApp(App):
         cmd = self._extract_prompt_command(raw_text).strip()
         if not cmd:
             return
-        self._recent_slash_commands = [c for c in self._recent_slash_commands if c != cmd]
-        self._recent_slash_commands.insert(0, cmd)
-        self._recent_slash_commands = self._recent_slash_commands[:16]
+        recent = self._recent_slash_commands
+        recent.pop(cmd, None)
+        recent[cmd] = None
+        recent.move_to_end(cmd, last=False)
+        while len(recent) > 16:
+            recent.popitem(last=True)
+        self._suggestions_dirty = True
+        self._drawer_version += 1
 
     def _command_drawer_content(self) -> str:
+        version, cached = self._drawer_cache
+        if version == self._drawer_version:
+            return cached
         lines = ["[b]Commands[/b]", ""]
-        desc = {
-            "/help": "查看命令帮助",
-            "/provider [name]": "切换 provider",
-            "/providers": "列出 provider",
-            "/model [name]": "切换模型",
-            "/build [fast|balanced|deep]": "切换构建模式",
-            "/approve [on|off]": "风险操作自动审批",
-            "/sessions": "查看会话列表",
-            "/session [id]": "切换会话",
-            "/new": "创建新会话",
-            "/themes": "列出主题",
-            "/theme [name]": "切换主题",
-            "/doctor [provider]": "诊断 API Key 和 .env",
-            "/stats": "显示统计",
-            "/clear": "清屏",
-            "/exit": "退出",
-        }
+        desc = self.COMMAND_DESCRIPTIONS
         for cmd in self.runner.slash_commands():
             lines.append(f"[cyan]{cmd}[/cyan]  [dim]{desc.get(cmd, '')}[/dim]")
 
@@ -992,7 +1218,7 @@ class AgentTUIApp(App):
         lines.append(f"[dim]/provider {self.runner.provider_name}[/dim]")
         lines.append(f"[dim]/model {self.runner.model_name}[/dim]")
 
-        sessions = list_saved_chat_sessions(limit=6)
+        sessions = self._saved_sessions_snapshot[:6]
         if sessions:
             lines.append("")
             lines.append("[b]Recent Session IDs[/b]")
@@ -1003,22 +1229,28 @@ class AgentTUIApp(App):
         if self._recent_slash_commands:
             lines.append("")
             lines.append("[b]Recent Commands[/b]")
-            for cmd in self._recent_slash_commands[:6]:
+            for cmd in list(self._recent_slash_commands)[:6]:
                 lines.append(f"[dim]{cmd}[/dim]")
-        return "\n".join(lines)
+        content = "\n".join(lines)
+        self._drawer_cache = (self._drawer_version, content)
+        return content
 
     def _render_command_drawer(self) -> None:
-        drawer = self.query_one("#command_drawer", Static)
         showing = self._drawer_width > 0 or self._drawer_target_width > 0
+        key = (showing, self._drawer_width, self._drawer_version)
+        if key == self._last_drawer_render:
+            return
+        self._last_drawer_render = key
+        if not showing:
+            body = ""
+        elif self._drawer_width <= 4:
+            body = "[dim]...[/dim]"
+        else:
+            body = self._command_drawer_content()
+        drawer = self._w_drawer
         drawer.display = showing
         drawer.styles.width = self._drawer_width
-        if not showing:
-            drawer.update("")
-            return
-        if self._drawer_width <= 4:
-            drawer.update("[dim]...[/dim]")
-            return
-        drawer.update(self._command_drawer_content())
+        drawer.update(body)
 
     def _animate_drawer_step(self) -> None:
         if self._drawer_width == self._drawer_target_width:
@@ -1039,136 +1271,196 @@ class AgentTUIApp(App):
         self._scanner_pos += self._scanner_dir
         self._refresh_flow_visuals()
         self._refresh_status_bar()
-        self._animate_drawer_step()
-        self._animate_usage_numbers()
+        if self._drawer_width != self._drawer_target_width:
+            self._animate_drawer_step()
+        if self._dirty_drawer:
+            self._dirty_drawer = False
+            self._render_command_drawer()
         self._refresh_slash_panel()
         if self._live_mode:
             self._flush_stream_preview()
+        if self._usage_display != self._usage_target:
+            # Counters are mid-tween; keep them at frame rate until they settle.
+            self._animate_usage_numbers()
+            self._dirty_side = True
+        if self._dirty_side:
+            self._dirty_side = False
+            self._refresh_side()
+
+    def _tick_side(self) -> None:
+        # Side panels (session/usage/stage) don't need frame-rate repaints.
+        self._animate_usage_numbers()
         self._refresh_side()
 
     def consume_runtime_event(self, item: _RuntimePayload) -> None:
-        event_type = item.event_type
-        payload = item.payload
+        handler = self._event_handlers.get(item.event_type)
+        if handler is not None:
+            handler(item.payload)
+        # Streaming delivers many events per frame; _tick_ui repaints once for all
+        # of them (flow and status bar are already repainted every tick).
+        self._dirty_side = True
+        self._dirty_drawer = True
+
+    def _gutter_text(self, message: str, style: Style) -> Text:
+        line = Text()
+        line.append("  │ ", style=_STYLE_GUTTER)
+        line.append(message, style=style)
+        return line
+
+    def _on_turn_user(self, payload: dict[str, Any]) -> None:
+        badge = Text()
+        badge.append(" YOU ", style="bold black on yellow")
+        badge.append(f"  {payload.get('text', '')}", style="white")
+        self._timeline_append_message("you", badge)
+
+    def _on_status_stage(self, payload: dict[str, Any]) -> None:
+        self._flow_active = True
+        self._flow_label, self._flow_detail = self._normalize_stage(
+            str(payload.get("label", "thinking")),
+            str(payload.get("detail", "")),
+        )
 
-        if event_type == "turn.user":
-            badge = Text()
-            badge.append(" YOU ", style="bold black on yellow")
-            badge.append(f"  {payload.get('text', '')}", style="white")
-            self._timeline_append_message("you", badge)
-        elif event_type == "status.stage":
-            self._flow_active = True
-            self._flow_label, self._flow_detail = self._normalize_stage(
-                str(payload.get("label", "thinking")),
-                str(payload.get("detail", "")),
-            )
-        elif event_type == "status.clear":
-            self._flow_active = False
-            self._flow_label = "idle"
-            self._flow_detail = ""
-        elif event_type == "assistant.reasoning.start":
-            self._live_mode = "reasoning"
-            self._reasoning_buffer = ""
-            self._reasoning_started_at = time.monotonic()
-            self._flush_stream_preview(force=True)
-        elif event_type == "assistant.reasoning.token":
-            self._reasoning_buffer += str(payload.get("token", ""))
-            self._flush_stream_preview()
-        elif event_type == "assistant.reasoning.end":
-            if self._reasoning_buffer:
-                duration = max(0.0, time.monotonic() - self._reasoning_started_at)
-                chars = len(self._reasoning_buffer)
-                self._last_reasoning_full = self._reasoning_buffer
-                info = Text()
-                info.append(" THINKING ", style="bold black on bright_black")
-                info.append(f"  {duration:.1f}s  {chars} chars  ", style="dim")
-                info.append("Ctrl+R to expand", style="dim italic")
-                self._timeline_append(info)
-            self._reasoning_buffer = ""
-            self._live_mode = ""
-            self._flush_stream_preview(force=True)
-        elif event_type == "assistant.stream.start":
-            self._live_mode = "assistant"
-            self._assistant_buffer = ""
-            self._flow_label, self._flow_detail = "writing...", "streaming response"
-            self._flush_stream_preview(force=True)
-        elif event_type == "assistant.stream.token":
-            self._assistant_buffer += str(payload.get("token", ""))
-            self._flush_stream_preview()
-        elif event_type == "assistant.stream.end":
-            badge = Text()
-            badge.append(" ASSISTANT ", style="bold black on cyan")
-            self._timeline_append_message(
-                "assistant",
-                Group(badge, Text(), Markdown(self._assistant_buffer or "")),
-            )
-            self._assistant_buffer = ""
-            self._live_mode = ""
-            self._flush_stream_preview(force=True)
-        elif event_type == "system.message":
-            sys_text = Text()
-            sys_text.append("  │ ", style="bright_black")
-            sys_text.append(str(payload.get("text", "")), style="dim")
-            self._timeline_append(sys_text)
-        elif event_type == "tool.call":
-            risky = bool(payload.get("risky"))
-            self._flow_active = True
-            self._flow_label = "running tool..."
-            self._flow_detail = str(payload.get("name", "tool"))
-            tool_name = str(payload.get("name", ""))
-            summary = self._summarize_tool_args(payload.get("args"))
+    def _on_status_clear(self, payload: dict[str, Any]) -> None:
+        self._flow_active = False
+        self._flow_label = "idle"
+        self._flow_detail = ""
 
-            badge = Text()
-            if risky:
-                badge.append(" RISK ", style="bold white on red")
-            else:
-                badge.append(" TOOL ", style="bold black on bright_magenta")
-            badge.append(f"  {tool_name}", style="bold bright_magenta")
-            if summary:
-                badge.append(f"  {summary}", style="dim bright_magenta")
-            self._timeline_append_message("tool", badge)
-        elif event_type == "tool.result":
-            rendered = str(payload.get("result", ""))
-            elapsed = float(payload.get("elapsed_ms", 0.0) or 0.0)
-            self._flow_active = True
-            self._flow_label = "tool done..."
-            self._flow_detail = f"{elapsed:.0f}ms"
-            elapsed_text = Text()
-            elapsed_text.append("  │ ", style="bright_black")
-            elapsed_text.append(f"completed in {elapsed:.0f}ms", style="dim")
-            self._timeline_append(elapsed_text)
-            lines = rendered.splitlines()
-            is_diff = len(lines) >= 2 and lines[0].startswith("---") and lines[1].startswith("+++")
-            self._append_tool_result(rendered, is_diff=is_diff)
-        elif event_type == "tool.plan":
-            self._flow_active = True
-            self._flow_label = "planning tools..."
-            count = int(payload.get("count", 0) or 0)
-            plan_text = Text()
-            plan_text.append("  │ ", style="bright_black")
-            plan_text.append(f"planning {count} tool call{'s' if count != 1 else ''}", style="dim cyan")
-            self._timeline_append(plan_text)
-        elif event_type in {"session.switched", "runtime.provider.changed", "runtime.model.changed", "runtime.mode.changed", "runtime.theme.changed"}:
-            self._refresh_input_suggester()
-            if event_type == "session.switched":
-                sid = str(payload.get("session_id", ""))
-                self._timeline_append_message("session", f"[green]session switched[/green] {sid}")
-                self._render_messages_from_runner()
-            elif event_type == "runtime.theme.changed":
-                self._theme_name = str(payload.get("theme", "")).strip() or self._theme_name
-                self._apply_theme(force=True)
-                self._timeline_append(f"[dim]theme switched: {self._theme_name}[/dim]")
+    def _on_reasoning_start(self, payload: dict[str, Any]) -> None:
+        self._live_mode = "reasoning"
+        self._reasoning_chunks = []
+        self._reasoning_started_at = time.monotonic()
+        self._flush_stream_preview(force=True)
+
+    def _on_reasoning_token(self, payload: dict[str, Any]) -> None:
+        self._reasoning_chunks.append(str(payload.get("token", "")))
+        self._flush_stream_preview()
+
+    def _on_reasoning_end(self, payload: dict[str, Any]) -> None:
+        reasoning = _join_chunks(self._reasoning_chunks)
+        if reasoning:
+            duration = max(0.0, time.monotonic() - self._reasoning_started_at)
+            chars = len(reasoning)
+            self._last_reasoning_full = reasoning
+            info = Text()
+            info.append(" THINKING ", style="bold black on bright_black")
+            info.append(f"  {duration:.1f}s  {chars} chars  ", style="dim")
+            info.append("Ctrl+R to expand", style="dim italic")
+            self._timeline_append(info)
+        self._reasoning_chunks = []
+        self._live_mode = ""
+        self._flush_stream_preview(force=True)
+
+    def _on_stream_start(self, payload: dict[str, Any]) -> None:
+        self._live_mode = "assistant"
+        self._assistant_chunks = []
+        self._flow_label, self._flow_detail = "writing...", "streaming response"
+        self._flush_stream_preview(force=True)
+
+    def _on_stream_token(self, payload: dict[str, Any]) -> None:
+        self._assistant_chunks.append(str(payload.get("token", "")))
+        self._flush_stream_preview()
+
+    def _on_stream_end(self, payload: dict[str, Any]) -> None:
+        # Build through the history cache so a later timeline rebuild
+        # (clear, session switch) reuses this parse instead of redoing it.
+        content = _join_chunks(self._assistant_chunks).strip()
+        key = ("assistant", "", hash(content))
+        renderable = self._msg_renderable_cache.get(key)
+        if renderable is None:
+            renderable = self._build_message_renderable("assistant", "", content)
+            self._msg_renderable_cache[key] = renderable
+        self._timeline_append_message("assistant", renderable)
+        self._assistant_chunks = []
+        self._live_mode = ""
+        self._flush_stream_preview(force=True)
+
+    def _on_system_message(self, payload: dict[str, Any]) -> None:
+        self._timeline_append(self._gutter_text(str(payload.get("text", "")), _STYLE_DIM))
+
+    def _on_tool_call(self, payload: dict[str, Any]) -> None:
+        risky = bool(payload.get("risky"))
+        self._flow_active = True
+        self._flow_label = "running tool..."
+        self._flow_detail = str(payload.get("name", "tool"))
+        tool_name = str(payload.get("name", ""))
+        summary = self._summarize_tool_args(payload.get("args"))
+
+        badge = Text()
+        if risky:
+            badge.append(" RISK ", style="bold white on red")
+        else:
+            badge.append(" TOOL ", style="bold black on bright_magenta")
+        badge.append(f"  {tool_name}", style="bold bright_magenta")
+        if summary:
+            badge.append(f"  {summary}", style="dim bright_magenta")
+        self._timeline_append_message("tool", badge)
+
+    def _on_tool_result(self, payload: dict[str, Any]) -> None:
+        rendered = str(payload.get("result", ""))
+        elapsed = float(payload.get("elapsed_ms", 0.0) or 0.0)
+        self._flow_active = True
+        self._flow_label = "tool done..."
+        elapsed_label = f"{elapsed:.0f}ms"
+        self._flow_detail = elapsed_label
+        self._timeline_append(self._gutter_text(f"completed in {elapsed_label}", _STYLE_DIM))
+        # Unified diff: "---" header line immediately followed by "+++".
+        first_break = rendered.find("\n") if rendered.startswith("---") else -1
+        is_diff = first_break != -1 and rendered.startswith("+++", first_break + 1)
+        self._append_tool_result(rendered, is_diff=is_diff)
+
+    def _on_tool_plan(self, payload: dict[str, Any]) -> None:
+        self._flow_active = True
+        self._flow_label = "planning tools..."
+        count = int(payload.get("count", 0) or 0)
+        plural = "" if count == 1 else "s"
+        self._timeline_append(self._gutter_text(f"planning {count} tool call{plural}", _STYLE_DIM_CYAN))
+
+    def _on_runtime_changed(self, payload: dict[str, Any]) -> None:
+        self._suggestions_dirty = True
+        self._drawer_version += 1
+        self._refresh_input_suggester()
 
-        self._refresh_side()
-        self._refresh_flow_visuals()
-        self._refresh_status_bar()
-        self._render_command_drawer()
+    def _on_session_switched(self, payload: dict[str, Any]) -> None:
+        self._suggestions_dirty = True
+        self._drawer_version += 1
+        sid = str(payload.get("session_id", ""))
+        self._timeline_append_message("session", f"[green]session switched[/green] {sid}")
+        self._render_messages_from_runner()
+        self._refresh_sessions_snapshot()
+        self._refresh_input_suggester()
+
+    def _on_theme_changed(self, payload: dict[str, Any]) -> None:
+        self._suggestions_dirty = True
+        self._drawer_version += 1
+        self._theme_name = str(payload.get("theme", "")).strip() or self._theme_name
+        self._apply_theme(force=True)
+        self._timeline_append(f"[dim]theme switched: {self._theme_name}[/dim]")
+        self._refresh_input_suggester()
 
     @work(thread=True, exclusive=True)
     def _run_user_turn(self, text: str) -> None:
         result = self.runner.handle_input(text)
         self.call_from_thread(self._after_turn, result)
 
+    @work(thread=True, exclusive=True, group="sessions")
+    def _refresh_sessions_snapshot(self) -> None:
+        # list_saved_chat_sessions parses every session file; keep it off the UI thread.
+        sessions = list_saved_chat_sessions(limit=30)
+        self.call_from_thread(self._apply_sessions_snapshot, sessions)
+
+    def _apply_sessions_snapshot(self, sessions: list[dict[str, Any]]) -> None:
+        self._saved_sessions_snapshot = sessions
+        self._suggestions_dirty = True
+        self._drawer_version += 1
+        self._refresh_input_suggester()
+        self._render_command_drawer()
+
     def _after_turn(self, result: dict[str, Any]) -> None:
+        # A finished turn may have saved the session, changed model/theme or cwd.
+        self._suggestions_dirty = True
+        self._drawer_version += 1
+        self._dirty_status = True
+        self._refresh_sessions_snapshot()
         kind = result.get("kind")
         if kind == "command":
             action = result.get("action")
@@ -1248,7 +1540,7 @@ class AgentTUIApp(App):
             event.prevent_default()
 
     def _prompt_get_value(self) -> str:
-        widget = self.query_one("#prompt_input")
+        widget = self._w_prompt
         if isinstance(widget, Input):
             return widget.value
         if self._use_textarea:
@@ -1256,7 +1548,7 @@ class AgentTUIApp(App):
         return ""
 
     def _prompt_set_value(self, text: str) -> None:
-        widget = self.query_one("#prompt_input")
+        widget = self._w_prompt
         if isinstance(widget, Input):
             widget.value = text
             return
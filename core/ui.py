@@ -1,28 +1,164 @@
 # core/ui.py
 # Terminal UI layer — OpenCode-grade visual polish
 
+import atexit
 import json
 import difflib
+import queue
+import re
+import sys
+import threading
 import time
-from typing import Any
+from functools import lru_cache, wraps
+from typing import TYPE_CHECKING, Any, Callable
 from rich.console import Console, Group
 from rich.panel import Panel
-from rich.syntax import Syntax
-from rich.markdown import Markdown
+from rich.style import Style
 from rich.text import Text
+from rich.theme import Theme
 from rich.table import Table
-from rich.columns import Columns
-from rich.rule import Rule
 from rich import box
-from rich.live import Live
-from rich.align import Align
 
-console = Console()
+if TYPE_CHECKING:
+    from rich.live import Live
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from cdifflib import CSequenceMatcher
+except ImportError:
+    pass
+else:
+    # cdifflib only ships the matcher; difflib.unified_diff looks SequenceMatcher
+    # up at call time, so swapping it in gives the C speed with identical output.
+    difflib.SequenceMatcher = CSequenceMatcher
+
+# Parsed once; the meter, progress bar and thinking line are redrawn constantly.
+_STYLE_BOLD_BRIGHT_CYAN = Style.parse("bold bright_cyan")
+_STYLE_BRIGHT_CYAN = Style.parse("bright_cyan")
+_STYLE_BRIGHT_BLACK = Style.parse("bright_black")
+_STYLE_DIM = Style.parse("dim")
+_STYLE_CYAN = Style.parse("cyan")
+_STYLE_WHITE = Style.parse("white")
+_STYLE_BOLD_RED = Style.parse("bold red")
+_STYLE_BRIGHT_BLUE = Style.parse("bright_blue")
+_STYLE_GREEN = Style.parse("green")
+_STYLE_BOLD_WHITE = Style.parse("bold white")
+_STYLE_YELLOW = Style.parse("yellow")
+_STYLE_BOLD_CYAN = Style.parse("bold cyan")
+_STYLE_DIM_BRIGHT_CYAN = Style.parse("dim bright_cyan")
+
+# Short markup aliases keep the frequently printed prompts terse to parse.
+_THEME = Theme({
+    "kw": "bold bright_cyan",
+    "ok": "bold green",
+    "err": "bold red",
+    "prompt": "bold bright_red",
+    "warn": "bold yellow",
+    "mode": "bold magenta",
+})
+
+console = Console(theme=_THEME)
 _status = None
 _assistant_stream_open = False
 _reasoning_stream_open = False
-_live: Live | None = None
-_live_buffer = ""
+_live: "Live | None" = None
+_live_chunks: list[str] = []
+_live_text = Text()
+_live_last_flush = 0.0
+_LIVE_FLUSH_INTERVAL = 0.066
+_UI_MIN_INTERVAL = 0.05
+_last_thinking_ts = 0.0
+_last_thinking_key: tuple[str, str, int] | None = None
+_last_meter_ts = 0.0
+_last_meter_key: tuple = ()
+_last_meter_text: Text | None = None
+# Any Markdown construct worth rendering; replies without one stay plain Text.
+_MD_RE = re.compile(r"(^|\n)\s*(#|>|\*|-|\+|\||\d+\.)|`|\*\*|__|\[[^\]]+\]\(")
+_reasoning_buf: list[str] = []
+_last_reasoning_flush = 0.0
+_REASONING_FLUSH_INTERVAL = 0.033
+_STREAM_CURSOR = Text("▍", style=_STYLE_BRIGHT_CYAN)
+
+# ── paint thread ──────────────────────────────────────────────────────
+# Heavy panels (bot replies, tool results, meters) are rendered on a daemon
+# thread so the engine loop never waits on terminal writes. Every other
+# printer drains the queue first, so output order is unchanged.
+
+_PAINT_BATCH_MAX = 32
+_PAINT_BATCH_WAIT = 0.02
+_paint_queue: "queue.Queue[Callable[[], None]]" = queue.Queue()
+_paint_thread: threading.Thread | None = None
+_paint_lock = threading.Lock()
+
+
+def _paint_loop():
+    while True:
+        batch = [_paint_queue.get()]
+        deadline = time.monotonic() + _PAINT_BATCH_WAIT
+        while len(batch) < _PAINT_BATCH_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_paint_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            # One buffered console session per batch -> one terminal write.
+            with console:
+                for job in batch:
+                    try:
+                        job()
+                    except Exception as e:
+                        print(f"ui paint error: {e}", file=sys.stderr)
+        finally:
+            for _ in batch:
+                _paint_queue.task_done()
+
+
+def _ensure_paint_thread():
+    global _paint_thread
+    if _paint_thread is not None:
+        return
+    with _paint_lock:
+        if _paint_thread is None:
+            thread = threading.Thread(target=_paint_loop, name="ui-paint", daemon=True)
+            thread.start()
+            _paint_thread = thread
+
+
+def flush_paint():
+    """Block until every queued paint has reached the terminal."""
+    if _paint_thread is None or threading.current_thread() is _paint_thread:
+        return
+    if _paint_queue.unfinished_tasks:
+        _paint_queue.join()
+
+
+atexit.register(flush_paint)
+
+
+def _deferred(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if threading.current_thread() is _paint_thread:
+            return fn(*args, **kwargs)
+        _ensure_paint_thread()
+        _paint_queue.put(lambda: fn(*args, **kwargs))
+    return wrapper
+
+
+def _synced(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        flush_paint()
+        return fn(*args, **kwargs)
+    return wrapper
+
 
 # ── branding ──────────────────────────────────────────────────────────
 
@@ -37,69 +173,133 @@ _LOGO = r"""
      ╰─────────────────────────────────────╯
 """
 
+
+def _build_logo_text() -> Text:
+    logo_text = Text()
+    gradient = ["bright_cyan", "cyan", "blue", "bright_blue", "cyan", "bright_cyan"]
+    for i, line in enumerate(_LOGO.strip().splitlines()):
+        color = gradient[i % len(gradient)]
+        logo_text.append(line + "\n", style=color)
+    return logo_text
+
+
+# Built once: the gradient never changes between welcome redraws.
+_LOGO_TEXT = _build_logo_text()
+
 _SPINNER_FRAMES = ("⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏")
 _FLOW_FRAMES = ("▰▱▱▱", "▰▰▱▱", "▰▰▰▱", "▰▰▰▰", "▱▰▰▰", "▱▱▰▰", "▱▱▱▰", "▱▱▱▱")
+_SPINNER_LEN = len(_SPINNER_FRAMES)
+_FLOW_LEN = len(_FLOW_FRAMES)
+
+
+def _dumps_pretty(value: Any) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits; let stdlib decide
+    return json.dumps(value, ensure_ascii=False, indent=2)
+
+
+def _loads(raw: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
 
 def _as_text(value: Any) -> str:
     if isinstance(value, str):
         return value
     try:
-        return json.dumps(value, ensure_ascii=False, indent=2)
+        return _dumps_pretty(value)
     except Exception:
         return str(value)
 
 
-def _classify_text(text: str) -> tuple[str, str]:
-    lower = text.lower()
-    if any(token in lower for token in ("error", "failed", "traceback", "异常", "错误")):
-        return "red", "ERROR"
-    if any(token in lower for token in ("warn", "warning", "警告")):
+_ERROR_TOKENS = ("error", "failed", "traceback", "异常", "错误")
+_WARN_TOKENS = ("warn", "warning", "警告")
+_OK_TOKENS = ("ok", "success", "done", "通过", "成功")
+_CLASSIFY_SCAN_CHARS = 4096
+# Skills lead their return strings with a status emoji; trust it when present.
+_CLASSIFY_PREFIX = {
+    "❌": ("red", "ERROR"),
+    "✅": ("green", "OK"),
+    "⚠": ("yellow", "WARN"),
+    "✍": ("cyan", "RESULT"),
+    "🛠": ("cyan", "RESULT"),
+}
+_CLASSIFY_RE = re.compile(
+    "|".join(
+        f"(?P<{name}>{'|'.join(map(re.escape, tokens))})"
+        for name, tokens in (("error", _ERROR_TOKENS), ("warn", _WARN_TOKENS), ("ok", _OK_TOKENS))
+    ),
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=1024)
+def _classify_head(head: str) -> tuple[str, str]:
+    # One case-insensitive pass; ERROR wins outright, otherwise WARN beats OK.
+    seen_warn = seen_ok = False
+    for match in _CLASSIFY_RE.finditer(head):
+        kind = match.lastgroup
+        if kind == "error":
+            return "red", "ERROR"
+        if kind == "warn":
+            seen_warn = True
+        else:
+            seen_ok = True
+    if seen_warn:
         return "yellow", "WARN"
-    if any(token in lower for token in ("ok", "success", "done", "通过", "成功")):
+    if seen_ok:
         return "green", "OK"
     return "cyan", "RESULT"
 
 
+def _classify_text(text: str) -> tuple[str, str]:
+    hit = _CLASSIFY_PREFIX.get(text[:1])
+    if hit is not None:
+        return hit
+    # Status markers sit at the top of tool output; scanning the head keeps
+    # huge results cheap and gives repeated results a bounded cache key.
+    return _classify_head(text[:_CLASSIFY_SCAN_CHARS])
+
+
 def _progress_bar(progress: float, width: int = 20) -> Text:
     pct = min(1.0, max(0.0, float(progress or 0.0)))
-    filled = int(round(width * pct))
+    return _progress_bar_cells(int(round(width * pct)), width)
+
+
+# Shared across calls: callers only append_text() the bar, never mutate it.
+@lru_cache(maxsize=64)
+def _progress_bar_cells(filled: int, width: int) -> Text:
     bar = Text()
-    for i in range(width):
-        if i < filled:
-            bar.append("━", style="bold bright_cyan")
-        elif i == filled:
-            bar.append("╸", style="bright_cyan")
-        else:
-            bar.append("━", style="bright_black")
+    if filled:
+        bar.append("━" * min(filled, width), style=_STYLE_BOLD_BRIGHT_CYAN)
+    if filled < width:
+        bar.append("╸", style=_STYLE_BRIGHT_CYAN)
+        if width - filled > 1:
+            bar.append("━" * (width - filled - 1), style=_STYLE_BRIGHT_BLACK)
     return bar
 
 
 def _spinner() -> str:
-    idx = int(time.time() * 10) % len(_SPINNER_FRAMES)
-    return _SPINNER_FRAMES[idx]
+    return _SPINNER_FRAMES[int(time.time() * 10) % _SPINNER_LEN]
 
 
 def _flow_bar() -> str:
-    idx = int(time.time() * 3) % len(_FLOW_FRAMES)
-    return _FLOW_FRAMES[idx]
+    return _FLOW_FRAMES[int(time.time() * 3) % _FLOW_LEN]
 
 
 # ── welcome ───────────────────────────────────────────────────────────
 
+@_synced
 def print_welcome(
     skill_count: int,
     model_name: str = "",
     build_mode: str = "balanced",
     provider_name: str = "moonshot",
 ):
-    # Logo with gradient
-    logo_text = Text()
-    gradient = ["bright_cyan", "cyan", "blue", "bright_blue", "cyan", "bright_cyan"]
-    for i, line in enumerate(_LOGO.strip().splitlines()):
-        color = gradient[i % len(gradient)]
-        logo_text.append(line + "\n", style=color)
-
     # Info grid
     info = Table.grid(padding=(0, 2))
     info.add_column(style="dim", min_width=10)
@@ -114,7 +314,7 @@ def print_welcome(
     inner = Table.grid(expand=True)
     inner.add_column(ratio=5)
     inner.add_column(ratio=4)
-    inner.add_row(logo_text, info)
+    inner.add_row(_LOGO_TEXT, info)
 
     console.print(
         Panel(
@@ -129,31 +329,36 @@ def print_welcome(
 
 # ── slash help ────────────────────────────────────────────────────────
 
-def print_slash_help(commands: list[str] | None = None):
-    rows = commands or [
-        "/help", "/provider [name]", "/providers", "/model [name]",
-        "/build [fast|balanced|deep]", "/approve [on|off]",
-        "/sessions", "/session [id]", "/new",
-        "/themes", "/theme [name]", "/doctor [provider]",
-        "/stats", "/clear", "/exit",
-    ]
-    descriptions = {
-        "/help": "查看命令帮助",
-        "/provider [name]": "查看或切换 provider",
-        "/providers": "列出可用 provider",
-        "/model [name]": "查看或切换模型",
-        "/build [fast|balanced|deep]": "查看或切换构建模式",
-        "/approve [on|off]": "风险工具自动审批开关",
-        "/sessions": "显示最近会话摘要",
-        "/session [id]": "切换到指定会话",
-        "/new": "创建并切换到新会话",
-        "/themes": "列出可用 UI 主题",
-        "/theme [name]": "切换 UI 主题",
-        "/doctor [provider]": "诊断 API Key / .env 加载状态",
-        "/stats": "显示当前会话统计",
-        "/clear": "清屏并重画首页",
-        "/exit": "退出程序",
-    }
+_SLASH_HELP_ROWS = (
+    "/help", "/provider [name]", "/providers", "/model [name]",
+    "/build [fast|balanced|deep]", "/approve [on|off]",
+    "/sessions", "/session [id]", "/new",
+    "/themes", "/theme [name]", "/doctor [provider]",
+    "/stats", "/clear", "/exit",
+)
+_SLASH_HELP_DESCRIPTIONS = {
+    "/help": "查看命令帮助",
+    "/provider [name]": "查看或切换 provider",
+    "/providers": "列出可用 provider",
+    "/model [name]": "查看或切换模型",
+    "/build [fast|balanced|deep]": "查看或切换构建模式",
+    "/approve [on|off]": "风险工具自动审批开关",
+    "/sessions": "显示最近会话摘要",
+    "/session [id]": "切换到指定会话",
+    "/new": "创建并切换到新会话",
+    "/themes": "列出可用 UI 主题",
+    "/theme [name]": "切换 UI 主题",
+    "/doctor [provider]": "诊断 API Key / .env 加载状态",
+    "/stats": "显示当前会话统计",
+    "/clear": "清屏并重画首页",
+    "/exit": "退出程序",
+}
+
+
+_slash_help_cache: dict[tuple[str, ...], Panel] = {}
+
+
+def _build_slash_help_panel(rows: tuple[str, ...]) -> Panel:
     table = Table(
         box=box.SIMPLE_HEAD,
         show_lines=False,
@@ -164,20 +369,28 @@ def print_slash_help(commands: list[str] | None = None):
     table.add_column("Command", style="cyan", min_width=28)
     table.add_column("Description", style="white")
     for cmd in rows:
-        table.add_row(cmd, descriptions.get(cmd, ""))
-    console.print(
-        Panel(
-            table,
-            title="[bold bright_cyan]/ Commands[/bold bright_cyan]",
-            border_style="bright_black",
-            box=box.ROUNDED,
-            padding=(0, 1),
-        )
+        table.add_row(cmd, _SLASH_HELP_DESCRIPTIONS.get(cmd, ""))
+    return Panel(
+        table,
+        title="[kw]/ Commands[/kw]",
+        border_style="bright_black",
+        box=box.ROUNDED,
+        padding=(0, 1),
     )
 
 
+@_synced
+def print_slash_help(commands: list[str] | None = None):
+    rows = tuple(commands or _SLASH_HELP_ROWS)
+    panel = _slash_help_cache.get(rows)
+    if panel is None:
+        panel = _slash_help_cache[rows] = _build_slash_help_panel(rows)
+    console.print(panel)
+
+
 # ── messages ──────────────────────────────────────────────────────────
 
+@_synced
 def print_user(text: str):
     if not text:
         return
@@ -195,9 +408,12 @@ def print_user(text: str):
     )
 
 
+@_deferred
 def print_bot(text):
     if not text:
         return
+    from rich.markdown import Markdown
+
     console.print()
     header = Text()
     header.append(" ASSISTANT ", style="bold black on cyan")
@@ -212,17 +428,21 @@ def print_bot(text):
     )
 
 
+@_synced
 def print_system(text):
     console.print(f"  [dim bright_black]│[/dim bright_black] [dim]{text}[/dim]")
 
 
+@_synced
 def clear_screen():
     console.clear()
 
 
 # ── runtime meter ─────────────────────────────────────────────────────
 
-def print_runtime_meter(stats: dict[str, Any], progress: float = 0.0):
+@_deferred
+def print_runtime_meter(stats: dict[str, Any], progress: float = 0.0, force: bool = False):
+    global _last_meter_ts, _last_meter_key, _last_meter_text
     session = str(stats.get("session_id", ""))[:14]
     turns = stats.get("turns", 0)
     steps = stats.get("steps", 0)
@@ -234,40 +454,59 @@ def print_runtime_meter(stats: dict[str, Any], progress: float = 0.0):
     cost = float(stats.get("total_cost_usd", 0.0) or 0.0)
     uptime = stats.get("uptime_s", 0)
 
-    bar = _progress_bar(progress)
     pct = int(min(100, max(0, round(progress * 100))))
+    key = (
+        session, turns, steps, tools, failures, prompt_tokens,
+        completion_tokens, total_tokens, round(cost, 5), uptime, pct,
+    )
+    # Callers can fire several identical meters per engine tick; drop repeats
+    # within 50 ms. Any change in the data, or force=True (final summary,
+    # /stats), always prints.
+    now = time.monotonic()
+    if not force and key == _last_meter_key and now - _last_meter_ts < _UI_MIN_INTERVAL:
+        return
+    _last_meter_ts = now
+    # Long tool calls repeat the same meter; reprint the last line as-is.
+    if key == _last_meter_key and _last_meter_text is not None:
+        console.print(_last_meter_text)
+        return
+
+    bar = _progress_bar(progress)
     spin = _spinner()
 
     line = Text()
-    line.append(f"  {spin} ", style="bold bright_cyan")
+    line.append(f"  {spin} ", style=_STYLE_BOLD_BRIGHT_CYAN)
     line.append_text(bar)
-    line.append(f" {pct:>3}%", style="dim")
-    line.append("  │ ", style="bright_black")
-    line.append(f"{session}", style="cyan")
-    line.append("  │ ", style="bright_black")
-    line.append(f"turn ", style="dim")
-    line.append(f"{turns}", style="white")
-    line.append(f"  step ", style="dim")
-    line.append(f"{steps}", style="white")
-    line.append(f"  tool ", style="dim")
-    line.append(f"{tools}", style="white")
+    line.append(f" {pct:>3}%", style=_STYLE_DIM)
+    line.append("  │ ", style=_STYLE_BRIGHT_BLACK)
+    line.append(f"{session}", style=_STYLE_CYAN)
+    line.append("  │ ", style=_STYLE_BRIGHT_BLACK)
+    line.append(f"turn ", style=_STYLE_DIM)
+    line.append(f"{turns}", style=_STYLE_WHITE)
+    line.append(f"  step ", style=_STYLE_DIM)
+    line.append(f"{steps}", style=_STYLE_WHITE)
+    line.append(f"  tool ", style=_STYLE_DIM)
+    line.append(f"{tools}", style=_STYLE_WHITE)
     if failures:
-        line.append(f"  err ", style="dim")
-        line.append(f"{failures}", style="bold red")
-    line.append("  │ ", style="bright_black")
-    line.append(f"tok ", style="dim")
-    line.append(f"{prompt_tokens}", style="bright_blue")
-    line.append("/", style="dim")
-    line.append(f"{completion_tokens}", style="green")
-    line.append(f"({total_tokens})", style="bold white")
-    line.append(f"  ${cost:.5f}", style="yellow")
-    line.append(f"  {uptime}s", style="dim")
-
+        line.append(f"  err ", style=_STYLE_DIM)
+        line.append(f"{failures}", style=_STYLE_BOLD_RED)
+    line.append("  │ ", style=_STYLE_BRIGHT_BLACK)
+    line.append(f"tok ", style=_STYLE_DIM)
+    line.append(f"{prompt_tokens}", style=_STYLE_BRIGHT_BLUE)
+    line.append("/", style=_STYLE_DIM)
+    line.append(f"{completion_tokens}", style=_STYLE_GREEN)
+    line.append(f"({total_tokens})", style=_STYLE_BOLD_WHITE)
+    line.append(f"  ${cost:.5f}", style=_STYLE_YELLOW)
+    line.append(f"  {uptime}s", style=_STYLE_DIM)
+
+    _last_meter_key = key
+    _last_meter_text = line
     console.print(line)
 
 
 # ── tool execution ────────────────────────────────────────────────────
 
+@_synced
 def print_tool_exec(func_name: str, args: dict | None = None, risky: bool = False):
     console.print()
     header = Text()
@@ -292,7 +531,51 @@ def print_tool_exec(func_name: str, args: dict | None = None, risky: bool = Fals
     console.print(header)
 
 
+_SYNTAX_CACHE_MAX_CHARS = 64 * 1024
+
+
+def _syntax(text: str, lexer: str, line_numbers: bool):
+    # Tool results repeat (retries, health polls); reuse the Syntax for
+    # identical payloads, but keep big ones out of the cache.
+    if len(text) > _SYNTAX_CACHE_MAX_CHARS:
+        from rich.syntax import Syntax
+
+        return Syntax(text, lexer, theme="monokai", line_numbers=line_numbers)
+    return _cached_syntax(text, lexer, line_numbers)
+
+
+@lru_cache(maxsize=128)
+def _cached_syntax(text: str, lexer: str, line_numbers: bool):
+    from rich.syntax import Syntax
+
+    return Syntax(text, lexer, theme="monokai", line_numbers=line_numbers)
+
+
+def _print_json_result(pretty: str, color: str, status: str) -> None:
+    console.print(
+        Panel(
+            _syntax(pretty, "json", False),
+            title=f"[bold {color}]{status}[/bold {color}]",
+            border_style=color,
+            box=box.ROUNDED,
+            padding=(0, 1),
+        )
+    )
+
+
+@_deferred
 def print_tool_result(text):
+    # Structured results are serialised once and go straight to the JSON view.
+    if isinstance(text, (dict, list)):
+        try:
+            pretty = _dumps_pretty(text)
+        except Exception:
+            pretty = None
+        if pretty is not None:
+            color, status = _classify_text(pretty)
+            _print_json_result(pretty, color, status)
+            return
+
     display = _as_text(text)
     color, status = _classify_text(display)
 
@@ -302,7 +585,7 @@ def print_tool_result(text):
     if len(lines) >= 2 and lines[0].startswith("---") and lines[1].startswith("+++"):
         console.print(
             Panel(
-                Syntax(display, "diff", theme="monokai", line_numbers=True),
+                _syntax(display, "diff", True),
                 title=f"[bold {color}]DIFF[/bold {color}]",
                 border_style=color,
                 box=box.ROUNDED,
@@ -312,21 +595,14 @@ def print_tool_result(text):
         return
 
     # JSON rendering
-    if display.strip().startswith("{") or display.strip().startswith("["):
+    if display.lstrip().startswith(("{", "[")):
         try:
-            pretty = json.dumps(json.loads(display), ensure_ascii=False, indent=2)
-            console.print(
-                Panel(
-                    Syntax(pretty, "json", theme="monokai", line_numbers=False),
-                    title=f"[bold {color}]{status}[/bold {color}]",
-                    border_style=color,
-                    box=box.ROUNDED,
-                    padding=(0, 1),
-                )
-            )
-            return
+            pretty = _dumps_pretty(_loads(display))
         except Exception:
-            pass
+            pretty = None
+        if pretty is not None:
+            _print_json_result(pretty, color, status)
+            return
 
     # Truncate long output
     if len(display) > 1400:
@@ -355,18 +631,27 @@ def print_tool_result(text):
 
 # ── thinking / streaming ─────────────────────────────────────────────
 
+@_synced
 def print_thinking(label: str = "thinking", detail: str = "", progress: float = 0.0):
-    global _status
+    global _status, _last_thinking_ts, _last_thinking_key
     pct = int(min(100, max(0, round(progress * 100))))
+    # The status spinner animates on its own; only re-render when the label
+    # changes, progress crosses a 5% step, or 50 ms have passed.
+    now = time.monotonic()
+    key = (label, detail, pct // 5)
+    if _status is not None and key == _last_thinking_key and now - _last_thinking_ts < _UI_MIN_INTERVAL:
+        return
+    _last_thinking_ts = now
+    _last_thinking_key = key
     spin = _spinner()
     flow = _flow_bar()
 
     message = Text()
-    message.append(f"{spin} ", style="bold bright_cyan")
-    message.append(f"{label}", style="bold cyan")
+    message.append(f"{spin} ", style=_STYLE_BOLD_BRIGHT_CYAN)
+    message.append(f"{label}", style=_STYLE_BOLD_CYAN)
     if detail:
-        message.append(f" · {detail}", style="dim")
-    message.append(f"  {flow}  {pct}%", style="dim bright_cyan")
+        message.append(f" · {detail}", style=_STYLE_DIM)
+    message.append(f"  {flow}  {pct}%", style=_STYLE_DIM_BRIGHT_CYAN)
 
     if _status is None:
         _status = console.status(message, spinner="dots", spinner_style="bright_cyan")
@@ -375,19 +660,24 @@ def print_thinking(label: str = "thinking", detail: str = "", progress: float =
         _status.update(message)
 
 
+@_synced
 def clear_thinking():
-    global _status
+    global _status, _last_thinking_key
     if _status is not None:
         _status.stop()
         _status = None
+    _last_thinking_key = None
 
 
+@_synced
 def start_assistant_stream(model_name: str = ""):
-    global _assistant_stream_open, _live, _live_buffer
+    global _assistant_stream_open, _live, _live_text, _live_last_flush
     if _assistant_stream_open:
         return
     end_reasoning_stream()
-    _live_buffer = ""
+    _live_chunks.clear()
+    _live_text = Text()
+    _live_last_flush = 0.0
 
     console.print()
     header = Text()
@@ -397,9 +687,11 @@ def start_assistant_stream(model_name: str = ""):
     header.append("  [dim](streaming)[/dim]")
     console.print(header)
 
+    from rich.live import Live
+
     _assistant_stream_open = True
     _live = Live(
-        Text("▍", style="bright_cyan"),
+        _STREAM_CURSOR.copy(),
         console=console,
         refresh_per_second=15,
         vertical_overflow="visible",
@@ -407,27 +699,44 @@ def start_assistant_stream(model_name: str = ""):
     _live.start()
 
 
+@_synced
 def stream_token(token: str):
-    global _live_buffer
+    global _live_last_flush
     if not _assistant_stream_open:
         start_assistant_stream()
-    _live_buffer += token
-    if _live is not None:
-        display = Text(_live_buffer)
-        display.append("▍", style="bright_cyan")
-        _live.update(display)
+    _live_chunks.append(token)
+    # Extend the rendered Text in place; Live only needs a new frame ~15 times a second.
+    _live_text.append(token)
+    if _live is None:
+        return
+    now = time.monotonic()
+    if now - _live_last_flush < _LIVE_FLUSH_INTERVAL:
+        return
+    _live_last_flush = now
+    display = _live_text.copy()
+    display.append_text(_STREAM_CURSOR)
+    _live.update(display)
 
 
+@_synced
 def stream_end():
-    global _assistant_stream_open, _live, _live_buffer
+    global _assistant_stream_open, _live, _live_text
     if _live is not None:
-        _live.update(Markdown(_live_buffer))
+        text = "".join(_live_chunks)
+        if _MD_RE.search(text) is None:
+            _live.update(Text(text))
+        else:
+            from rich.markdown import Markdown
+
+            _live.update(Markdown(text))
         _live.stop()
         _live = None
-    _live_buffer = ""
+    _live_chunks.clear()
+    _live_text = Text()
     _assistant_stream_open = False
 
 
+@_synced
 def start_reasoning_stream():
     global _reasoning_stream_open
     if _reasoning_stream_open:
@@ -440,15 +749,31 @@ def start_reasoning_stream():
     _reasoning_stream_open = True
 
 
+def _flush_reasoning():
+    global _last_reasoning_flush
+    _last_reasoning_flush = time.monotonic()
+    if not _reasoning_buf:
+        return
+    text = "".join(_reasoning_buf)
+    _reasoning_buf.clear()
+    console.print(text, end="", highlight=False, markup=False, style=_STYLE_DIM)
+
+
+@_synced
 def stream_reasoning_token(token: str):
     if not _reasoning_stream_open:
         start_reasoning_stream()
-    console.print(token, end="", highlight=False, style="dim")
+    # One Rich print per ~33 ms burst (or line) instead of one per token.
+    _reasoning_buf.append(token)
+    if "\n" in token or time.monotonic() - _last_reasoning_flush > _REASONING_FLUSH_INTERVAL:
+        _flush_reasoning()
 
 
+@_synced
 def end_reasoning_stream():
     global _reasoning_stream_open
     if _reasoning_stream_open:
+        _flush_reasoning()
         console.print("[/dim]")
         console.print()
     _reasoning_stream_open = False
@@ -456,6 +781,7 @@ def end_reasoning_stream():
 
 # ── session / input ───────────────────────────────────────────────────
 
+@_synced
 def ask_resume_chat(msg_count: int) -> bool:
     console.print()
     console.print(
@@ -466,10 +792,11 @@ def ask_resume_chat(msg_count: int) -> bool:
             padding=(0, 1),
         )
     )
-    choice = console.input("[bold bright_cyan]恢复上次对话？[/bold bright_cyan] [dim]\\[y/n]:[/dim] ").lower()
+    choice = console.input("[kw]恢复上次对话？[/kw] [dim]\\[y/n]:[/dim] ").lower()
     return choice in ("y", "")
 
 
+@_synced
 def get_user_input(prompt="\n[bold yellow]you ›[/bold yellow] "):
     try:
         return console.input(prompt)
@@ -479,6 +806,7 @@ def get_user_input(prompt="\n[bold yellow]you ›[/bold yellow] "):
         return "exit"
 
 
+@_synced
 def get_multiline_input(prompt_text):
     if prompt_text:
         console.print(prompt_text)
@@ -495,14 +823,31 @@ def get_multiline_input(prompt_text):
 
 # ── approval ──────────────────────────────────────────────────────────
 
+_DIFF_MAX_LINES = 20000
+_DIFF_HIGHLIGHT_MAX_BYTES = 2 * 1024 * 1024
+
+
 def _show_edit_diff(args):
-    old_text = args.get("old_text", "")
-    new_text = args.get("new_text", "")
-    diff = difflib.unified_diff(old_text.splitlines(), new_text.splitlines(), lineterm="")
-    diff_text = "\n".join(diff)
-    console.print(Syntax(diff_text, "diff", theme="monokai", line_numbers=True))
+    old_lines = args.get("old_text", "").splitlines()
+    new_lines = args.get("new_text", "").splitlines()
+    total = max(len(old_lines), len(new_lines))
+    diff_text = "\n".join(
+        difflib.unified_diff(old_lines[:_DIFF_MAX_LINES], new_lines[:_DIFF_MAX_LINES], lineterm="")
+    )
+    if len(diff_text) > _DIFF_HIGHLIGHT_MAX_BYTES:
+        console.print(Text(diff_text), soft_wrap=True)
+    else:
+        from rich.syntax import Syntax
+
+        console.print(Syntax(diff_text, "diff", theme="monokai", line_numbers=True))
+    if total > _DIFF_MAX_LINES:
+        console.print(
+            f"  [bold yellow]⚠ diff truncated: first {_DIFF_MAX_LINES} of {total} lines shown; "
+            f"changes past line {_DIFF_MAX_LINES} are not displayed[/bold yellow]"
+        )
 
 
+@_synced
 def ask_for_approval(func_name, args):
     """
     处理高风险操作的审批流程
@@ -510,6 +855,9 @@ def ask_for_approval(func_name, args):
     """
     console.print()
 
+    # Dumped at most once; shared by the info panel and the "v" view.
+    args_pretty = None
+
     # Build info display
     if func_name == "edit_file":
         filename = args.get("filename", "未知")
@@ -529,7 +877,8 @@ def ask_for_approval(func_name, args):
         cwd = args.get("cwd", ".")
         info_text = f"[bold]cmd[/bold]     {cmd}\n[bold]cwd[/bold]     {cwd}"
     else:
-        info_text = f"[bold]args[/bold]\n{json.dumps(args, ensure_ascii=False, indent=2)}"
+        args_pretty = _dumps_pretty(args)
+        info_text = f"[bold]args[/bold]\n{args_pretty}"
 
     # Action bar
     actions = Text()
@@ -556,7 +905,7 @@ def ask_for_approval(func_name, args):
     )
 
     while True:
-        choice = console.input("[bold bright_red]›[/bold bright_red] ").lower()
+        choice = console.input("[prompt]›[/prompt] ").lower()
 
         if choice == "v":
             if func_name == "edit_file":
@@ -565,25 +914,33 @@ def ask_for_approval(func_name, args):
                 content = args.get("content", "")
                 filename = args.get("filename", "")
                 ext = filename.rsplit(".", 1)[-1] if "." in filename else "text"
+                from rich.syntax import Syntax
+
                 console.print(Syntax(content, ext, theme="monokai", line_numbers=True))
             else:
-                console.print_json(json.dumps(args, ensure_ascii=False))
+                if args_pretty is None:
+                    args_pretty = _dumps_pretty(args)
+                from rich.highlighter import JSONHighlighter
+
+                view = JSONHighlighter()(Text(args_pretty))
+                view.no_wrap = True
+                console.print(view)
             continue
 
         if choice in ("y", ""):
-            console.print("[bold green]  approved[/bold green]")
+            console.print("[ok]  approved[/ok]")
             return True, None, args
 
         if choice == "n":
-            console.print("[bold red]  rejected[/bold red]")
+            console.print("[err]  rejected[/err]")
             return False, "用户拒绝了该操作。", None
 
         if choice == "r":
-            feedback = console.input("[bold yellow]feedback:[/bold yellow] ")
+            feedback = console.input("[warn]feedback:[/warn] ")
             return False, f"用户拒绝。反馈: '{feedback}'。请重试。", None
 
         if choice == "m":
-            console.print("[bold magenta]manual edit mode[/bold magenta]")
+            console.print("[mode]manual edit mode[/mode]")
             if func_name == "write_code_file":
                 console.print("请粘贴代码:")
                 new_content = get_multiline_input("")
@@ -594,7 +951,7 @@ def ask_for_approval(func_name, args):
                 new_json = console.input("输入新 JSON 参数: ")
                 if new_json.strip():
                     try:
-                        args = json.loads(new_json)
+                        args = _loads(new_json)
                         return True, None, args
                     except Exception:
                         console.print("[red]JSON 格式错误[/red]")
@@ -2,12 +2,11 @@
 # 启动程序
 
 import argparse
-from core.engine import run
-from core.runtime_replay import list_sessions, replay_session
-from skills import available_functions
 
 
 def _run_health():
+    from skills import available_functions
+
     fn = available_functions.get("runtime_health")
     if not fn:
         print("runtime_health 不可用")
@@ -17,6 +16,8 @@ def _run_health():
 
 
 def _run_smoke():
+    from skills import available_functions
+
     fn = available_functions.get("runtime_smoke")
     if not fn:
         print("runtime_smoke 不可用")
@@ -42,8 +43,12 @@ if __name__ == "__main__":
         if args.smoke:
             raise SystemExit(_run_smoke())
         if args.sessions:
+            from core.runtime_replay import list_sessions
+
             raise SystemExit(list_sessions())
         if args.replay is not None:
+            from core.runtime_replay import replay_session
+
             raise SystemExit(
                 replay_session(
                     args.replay,
@@ -60,6 +65,8 @@ if __name__ == "__main__":
             AgentTUIApp(compact=args.compact).run()
             raise SystemExit(0)
 
+        from core.engine import run
+
         run()
     except KeyboardInterrupt:
         print("\n👋 Bye!")
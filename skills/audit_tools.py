@@ -2,14 +2,41 @@
 # 工具调用审计链：记录每次工具调用的全链路日志，支持查询和统计
 
 import os
+import re
 import json
 import time
+import atexit
+import queue
+import threading
+from collections import Counter, defaultdict
+from itertools import islice
 from pathlib import Path
+from statistics import fmean
 from .registry import register
-from .path_safety import guard_path, WORKSPACE_ROOT
+from .path_safety import guard_path_cached, WORKSPACE_ROOT
 
-AUDIT_LOG_REL = "data/audit_log.jsonl"
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 按本地日期分片：data/audit/YYYY-MM-DD.jsonl；旧版单文件日志仍参与读取
+AUDIT_DIR_REL = "data/audit"
+AUDIT_LATEST_NAME = "latest.jsonl"
+LEGACY_AUDIT_LOG_REL = "data/audit_log.jsonl"
 MAX_QUERY_RESULTS = 50
+AUDIT_MAX_BATCH = 64
+AUDIT_FLUSH_EVERY = 32
+
+# 审计记录由后台线程批量写入，工具调用路径只做入队
+_audit_queue = queue.Queue()
+_audit_thread = None
+_audit_thread_lock = threading.Lock()
+
+# 写线程独占的常驻追加句柄（当天分片），出错或跨天时置空以便重新打开
+_AUDIT_FH = None
+_AUDIT_FH_DAY = None
+_audit_unflushed = 0
 
 
 def _display_path(path_obj):
@@ -19,20 +46,126 @@ def _display_path(path_obj):
         return str(path_obj)
 
 
-def _audit_file():
-    file_obj, err = guard_path(AUDIT_LOG_REL, must_exist=False, for_write=True)
+_SHARD_RE = re.compile(r"^\d{4}-\d{2}-\d{2}\.jsonl$")
+
+
+def _audit_file(day):
+    # 只校验固定的审计目录（guard_path_cached 无上限，不能按天换 key）；
+    # 分片名由 _format_ts 生成，直接拼接即可
+    dir_obj, err = guard_path_cached(AUDIT_DIR_REL, for_write=True)
     if err:
         raise ValueError(err)
-    if not file_obj.parent.exists():
-        file_obj.parent.mkdir(parents=True, exist_ok=True)
-    return file_obj
+    if not dir_obj.exists():
+        dir_obj.mkdir(parents=True, exist_ok=True)
+    return dir_obj / f"{day}.jsonl"
 
 
-def log_tool_call(func_name: str, args: dict, result_str: str, elapsed_ms: float = 0):
-    """Append one audit record. Called from engine.py after each tool execution."""
+def _link_latest(file_obj):
+    """Point latest.jsonl at the current shard; best effort (no symlinks on some Windows setups)."""
+    link = file_obj.with_name(AUDIT_LATEST_NAME)
+    tmp = file_obj.with_name(AUDIT_LATEST_NAME + ".tmp")
+    try:
+        if tmp.is_symlink():
+            tmp.unlink()
+        os.symlink(file_obj.name, tmp)
+        os.replace(tmp, link)
+    except (OSError, NotImplementedError):
+        pass
+
+
+def _get_audit_fh(day):
+    global _AUDIT_FH, _AUDIT_FH_DAY
+    if _AUDIT_FH is None or _AUDIT_FH_DAY != day:
+        _close_audit_fh()
+        file_obj = _audit_file(day)
+        _AUDIT_FH = open(file_obj, 'a', encoding='utf-8', buffering=1 << 16)
+        _AUDIT_FH_DAY = day
+        _link_latest(file_obj)
+    return _AUDIT_FH
+
+
+def _close_audit_fh():
+    global _AUDIT_FH, _AUDIT_FH_DAY
+    fh, _AUDIT_FH, _AUDIT_FH_DAY = _AUDIT_FH, None, None
+    if fh is not None:
+        try:
+            fh.close()
+        except OSError:
+            pass
+
+
+def _format_ts(epoch):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(epoch))
+
+
+def _write_batch(batch):
+    global _audit_unflushed
     try:
-        file_obj = _audit_file()
+        # ts 由 epoch 在写线程中格式化，调用方只读一次时钟；按 ts 的日期归入分片
+        by_day = {}
+        for r in batch:
+            ts = _format_ts(r["epoch"])
+            by_day.setdefault(ts[:10], []).append(
+                json.dumps({"ts": ts, **r}, ensure_ascii=False) + "\n"
+            )
+        # 最新的一天放在最后，句柄与 latest.jsonl 都停在当天分片
+        for day in sorted(by_day):
+            fh = _get_audit_fh(day)
+            fh.write("".join(by_day[day]))
+        _audit_unflushed += len(batch)
+        # 持续写入时每 32 条刷一次；队列空闲时立即刷，保证读取方可见
+        if _audit_unflushed >= AUDIT_FLUSH_EVERY or _audit_queue.qsize() == 0:
+            fh.flush()
+            _audit_unflushed = 0
+    except OSError:
+        _close_audit_fh()
+    except Exception:
+        pass  # audit must never break the main flow
+
+
+def _drain():
+    while True:
+        batch = [_audit_queue.get()]
+        while len(batch) < AUDIT_MAX_BATCH:
+            try:
+                batch.append(_audit_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            _write_batch(batch)
+        finally:
+            for _ in batch:
+                _audit_queue.task_done()
+
+
+def _ensure_writer():
+    global _audit_thread
+    if _audit_thread is not None:
+        return
+    with _audit_thread_lock:
+        if _audit_thread is None:
+            thread = threading.Thread(target=_drain, name="audit-writer", daemon=True)
+            thread.start()
+            _audit_thread = thread
+
+
+def flush_audit():
+    """Block until every queued audit record has been written."""
+    if _audit_thread is not None and _audit_queue.unfinished_tasks:
+        _audit_queue.join()
+
+
+def _shutdown_audit():
+    flush_audit()
+    _close_audit_fh()
+
+
+atexit.register(_shutdown_audit)
+
 
+def log_tool_call(func_name: str, args: dict, result_str: str, elapsed_ms: float = 0):
+    """Queue one audit record. Called from engine.py after each tool execution."""
+    try:
         # Truncate large argument values for storage
         safe_args = {}
         for k, v in (args or {}).items():
@@ -45,7 +178,6 @@ def log_tool_call(func_name: str, args: dict, result_str: str, elapsed_ms: float
             result_preview = result_preview[:500] + "..."
 
         record = {
-            "ts": time.strftime("%Y-%m-%d %H:%M:%S"),
             "epoch": time.time(),
             "tool": func_name,
             "args_summary": safe_args,
@@ -54,28 +186,121 @@ def log_tool_call(func_name: str, args: dict, result_str: str, elapsed_ms: float
             "elapsed_ms": round(elapsed_ms, 1),
         }
 
-        with open(file_obj, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        _ensure_writer()
+        _audit_queue.put(record)
 
     except Exception:
         pass  # audit must never break the main flow
 
 
-def _read_audit_lines(max_lines=500):
-    """Read recent audit entries."""
-    file_obj = _audit_file()
-    if not file_obj.exists():
-        return []
-
-    lines = []
-    with open(file_obj, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                lines.append(line)
-
-    # Keep only the most recent entries
-    return lines[-max_lines:]
+TAIL_BLOCK_SIZE = 1 << 16
+
+
+def _tail_lines(path, n):
+    """Return the last n non-empty lines, reading the file backwards in blocks."""
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = b""
+        while True:
+            if pos > 0:
+                step = min(TAIL_BLOCK_SIZE, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
+                if buf.count(b"\n") <= n:
+                    continue
+            # 未读到文件开头时，第一段可能是半行，丢弃
+            parts = buf.splitlines()
+            if pos > 0:
+                parts = parts[1:]
+            # JSONL 行内没有首尾空白，splitlines 已去掉 \r\n，无需 strip
+            lines = [p for p in parts if p]
+            if len(lines) >= n or pos == 0:
+                return lines[-n:]
+
+
+def _loads(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _decode_records(raw_lines, *needles):
+    """Decode raw JSONL lines, skipping lines that lack any needle before parsing."""
+    records = []
+    for raw in raw_lines:
+        if needles:
+            lowered = raw.lower()
+            if not all(n in lowered for n in needles):
+                continue
+        try:
+            records.append(_loads(raw))
+        except Exception:
+            continue
+    return records
+
+
+# log_tool_call 写出的记录字段顺序固定，统计只需 4 个字段，直接从原始行中截取
+_STATS_RE = re.compile(
+    rb'^\{"ts": "([^"\\]*)", "epoch": [^,]*, "tool": "([^"\\]*)", '
+    rb'.*"success": (true|false), "elapsed_ms": (-?[0-9.eE+]+)\}$'
+)
+
+
+def _iter_stat_fields(raw_lines):
+    """Yield (ts, tool, success, elapsed_ms) without decoding whole records."""
+    for raw in raw_lines:
+        m = _STATS_RE.match(raw)
+        if m:
+            yield (
+                m.group(1).decode('utf-8'),
+                m.group(2).decode('utf-8'),
+                m.group(3) == b"true",
+                float(m.group(4)),
+            )
+            continue
+        # 非标准格式的行（手工编辑、旧版本）退回完整解析
+        try:
+            r = _loads(raw)
+        except Exception:
+            continue
+        yield r.get("ts", ""), r.get("tool", "unknown"), r.get("success", True), r.get("elapsed_ms", 0)
+
+
+def _audit_sources(date=""):
+    """Return readable audit files oldest-first: the legacy log, then day shards matching date."""
+    sources = []
+    legacy_obj, err = guard_path_cached(LEGACY_AUDIT_LOG_REL, for_write=False)
+    if not err and legacy_obj.exists():
+        sources.append(legacy_obj)
+    dir_obj, err = guard_path_cached(AUDIT_DIR_REL, for_write=False)
+    if err:
+        return sources
+    try:
+        with os.scandir(dir_obj) as it:
+            names = sorted(
+                e.name for e in it
+                if _SHARD_RE.match(e.name) and e.name.startswith(date) and e.is_file()
+            )
+    except OSError:
+        names = []
+    sources.extend(dir_obj / name for name in names)
+    return sources
+
+
+def _read_audit_lines(max_lines=500, date=""):
+    """Read recent audit entries as raw bytes lines, newest shards first."""
+    flush_audit()
+    chunks = []
+    remaining = max_lines
+    # 有日期筛选时只打开匹配的分片（旧版日志仍作兜底）；cost follows max_lines
+    for file_obj in reversed(_audit_sources(date)):
+        lines = _tail_lines(file_obj, remaining)
+        chunks.append(lines)
+        remaining -= len(lines)
+        if remaining <= 0:
+            break
+    return [raw for lines in reversed(chunks) for raw in lines]
 
 
 # ==========================================
@@ -103,31 +328,54 @@ audit_query_schema = {
 }
 
 
+_RECORD_TEMPLATE = "  {status} [{ts}] {tool}{elapsed}"
+
+
+def _format_record(r):
+    """Render one audit record as its display block (trailing blank line included)."""
+    parts = [_RECORD_TEMPLATE.format_map({
+        "status": "✅" if r.get("success", True) else "❌",
+        "ts": r.get("ts", "?"),
+        "tool": r.get("tool", "?"),
+        "elapsed": f" ({r['elapsed_ms']}ms)" if r.get("elapsed_ms") else "",
+    })]
+
+    args_summary = r.get("args_summary", {})
+    if args_summary:
+        brief = ", ".join(f"{k}={v}" for k, v in islice(args_summary.items(), 3))
+        if len(brief) > 120:
+            brief = brief[:120] + "..."
+        parts.append(f"     参数: {brief}")
+
+    result = r.get("result_preview", "")
+    if result:
+        one_line = result.partition("\n")[0][:100]
+        parts.append(f"     结果: {one_line}")
+    parts.append("")
+    return "\n".join(parts)
+
+
 @register(audit_query_schema)
 def audit_query(tool_name: str = "", last_n: int = 20, only_errors: bool = False, date: str = ""):
     """查询审计日志"""
     try:
-        raw_lines = _read_audit_lines(500)
+        raw_lines = _read_audit_lines(500, date)
         if not raw_lines:
             return "📋 审计日志为空，尚无工具调用记录。"
 
-        records = []
-        for line in raw_lines:
-            try:
-                records.append(json.loads(line))
-            except Exception:
-                continue
+        # 原始字节预筛：不含工具名/日期的行直接跳过，不做 JSON 解码
+        needles = [v.lower().encode('utf-8') for v in (tool_name, date) if v]
+        records = _decode_records(raw_lines, *needles)
 
-        # Apply filters
-        if tool_name:
-            tool_name_lower = tool_name.lower()
-            records = [r for r in records if tool_name_lower in r.get("tool", "").lower()]
-
-        if only_errors:
-            records = [r for r in records if not r.get("success", True)]
-
-        if date:
-            records = [r for r in records if r.get("ts", "").startswith(date)]
+        # Apply filters in one pass
+        tool_name_lower = tool_name.lower()
+        if tool_name or only_errors or date:
+            records = [
+                r for r in records
+                if (not tool_name or tool_name_lower in r.get("tool", "").lower())
+                and (not only_errors or not r.get("success", True))
+                and (not date or r.get("ts", "").startswith(date))
+            ]
 
         last_n = max(1, min(int(last_n) if last_n else 20, MAX_QUERY_RESULTS))
         records = records[-last_n:]
@@ -135,26 +383,8 @@ def audit_query(tool_name: str = "", last_n: int = 20, only_errors: bool = False
         if not records:
             return "📋 没有匹配的审计记录"
 
-        lines = [f"📋 审计日志 (显示 {len(records)} 条):\n"]
-        for r in records:
-            status = "✅" if r.get("success", True) else "❌"
-            elapsed = f" ({r['elapsed_ms']}ms)" if r.get("elapsed_ms") else ""
-            lines.append(f"  {status} [{r.get('ts', '?')}] {r.get('tool', '?')}{elapsed}")
-
-            args_summary = r.get("args_summary", {})
-            if args_summary:
-                brief = ", ".join(f"{k}={v}" for k, v in list(args_summary.items())[:3])
-                if len(brief) > 120:
-                    brief = brief[:120] + "..."
-                lines.append(f"     参数: {brief}")
-
-            result = r.get("result_preview", "")
-            if result:
-                one_line = result.split("\n")[0][:100]
-                lines.append(f"     结果: {one_line}")
-            lines.append("")
-
-        return "\n".join(lines)
+        header = f"📋 审计日志 (显示 {len(records)} 条):\n"
+        return "\n".join([header, *map(_format_record, records)])
 
     except Exception as e:
         return f"❌ 查询审计日志失败: {e}"
@@ -183,39 +413,36 @@ audit_stats_schema = {
 def audit_stats(date: str = ""):
     """审计统计"""
     try:
-        raw_lines = _read_audit_lines(2000)
+        raw_lines = _read_audit_lines(2000, date)
         if not raw_lines:
             return "📊 审计日志为空"
 
-        records = []
-        for line in raw_lines:
-            try:
-                records.append(json.loads(line))
-            except Exception:
-                continue
-
+        # Single streaming pass: only ts/tool/success/elapsed are extracted
         if date:
-            records = [r for r in records if r.get("ts", "").startswith(date)]
+            date_b = date.encode('utf-8')
+            raw_lines = [raw for raw in raw_lines if date_b in raw]
+        total = successes = 0
+        first_ts = last_ts = "?"
+        tool_counts = Counter()
+        tool_times = defaultdict(list)
+        for ts, name, success, elapsed in _iter_stat_fields(raw_lines):
+            if date and not ts.startswith(date):
+                continue
+            if total == 0:
+                first_ts = ts or "?"
+            last_ts = ts or "?"
+            total += 1
+            if success:
+                successes += 1
+            tool_counts[name] += 1
+            if elapsed:
+                tool_times[name].append(elapsed)
 
-        if not records:
+        if not total:
             return f"📊 没有{'匹配日期 ' + date + ' 的' if date else ''}审计记录"
 
-        total = len(records)
-        successes = sum(1 for r in records if r.get("success", True))
         failures = total - successes
 
-        # Tool frequency
-        tool_counts = {}
-        tool_times = {}
-        for r in records:
-            name = r.get("tool", "unknown")
-            tool_counts[name] = tool_counts.get(name, 0) + 1
-            elapsed = r.get("elapsed_ms", 0)
-            if elapsed:
-                tool_times.setdefault(name, []).append(elapsed)
-
-        sorted_tools = sorted(tool_counts.items(), key=lambda x: x[1], reverse=True)
-
         date_label = f" ({date})" if date else ""
         lines = [f"📊 工具调用统计{date_label}:\n"]
         lines.append(f"  总调用次数: {total}")
@@ -223,18 +450,15 @@ def audit_stats(date: str = ""):
         lines.append(f"  失败: {failures} ({failures*100//total}%)")
 
         lines.append(f"\n  🔧 工具使用排行 (Top 10):")
-        for name, count in sorted_tools[:10]:
+        for name, count in tool_counts.most_common(10):
             avg_ms = ""
-            if name in tool_times and tool_times[name]:
-                avg = sum(tool_times[name]) / len(tool_times[name])
-                avg_ms = f"  avg {avg:.0f}ms"
+            times = tool_times.get(name)
+            if times:
+                avg_ms = f"  avg {fmean(times):.0f}ms"
             lines.append(f"    {count:3d}x  {name}{avg_ms}")
 
         # Time range
-        if records:
-            first_ts = records[0].get("ts", "?")
-            last_ts = records[-1].get("ts", "?")
-            lines.append(f"\n  📅 记录范围: {first_ts} ~ {last_ts}")
+        lines.append(f"\n  📅 记录范围: {first_ts} ~ {last_ts}")
 
         return "\n".join(lines)
 
@@ -3,15 +3,39 @@
 
 import os
 import json
+import hashlib
+import stat
 import time
+import atexit
 import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from .registry import register
-from .path_safety import guard_path, WORKSPACE_ROOT
+from .path_safety import guard_path, guard_path_cached, WORKSPACE_ROOT
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 BACKUP_DIR = "data/backups"
-BACKUP_INDEX = "data/backups/_index.json"
+BACKUP_INDEX = "data/backups/_index.jsonl"
+LEGACY_BACKUP_INDEX = "data/backups/_index.json"
 MAX_BACKUPS_PER_FILE = 10
+# 追加日志行数超过 key 数的 4 倍时重写为紧凑形式
+INDEX_COMPACT_RATIO = 4
+
+# 索引是只追加的 JSONL：每行 {"key", "entries"}，同一 key 以最后一行为准。
+# 解析结果按文件 (mtime, size) 缓存，其他进程写入后会自动重新加载。
+_index_cache = {"sig": None, "index": {}, "lines": 0}
+
+# 编辑工具的备份在单个后台线程里按提交顺序写入：同一文件的备份保持先后次序，
+# 索引也不会被并发追加。同步的 create_backup 与后台任务共用同一把锁。
+_BACKUP_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backup")
+_BACKUP_LOCK = threading.Lock()
+atexit.register(_BACKUP_EXECUTOR.shutdown)
 
 
 def _display_path(path_obj):
@@ -22,7 +46,7 @@ def _display_path(path_obj):
 
 
 def _ensure_backup_dir():
-    dir_obj, err = guard_path(BACKUP_DIR, must_exist=False, for_write=True)
+    dir_obj, err = guard_path_cached(BACKUP_DIR, for_write=True)
     if err:
         raise ValueError(err)
     if not dir_obj.exists():
@@ -30,27 +54,129 @@ def _ensure_backup_dir():
     return dir_obj
 
 
+def _index_sig(idx_obj):
+    try:
+        st = idx_obj.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _encode_line(key, entries) -> bytes:
+    rec = {"key": key, "entries": entries}
+    if orjson is not None:
+        return orjson.dumps(rec) + b"\n"
+    return (json.dumps(rec, ensure_ascii=False) + "\n").encode('utf-8')
+
+
+def _decode_line(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _read_index_file(idx_obj):
+    index = {}
+    lines = 0
+    with open(idx_obj, 'rb') as f:
+        data = f.read()
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            rec = _decode_line(line)
+        except Exception:
+            continue
+        lines += 1
+        key = rec.get("key")
+        entries = rec.get("entries") or []
+        if entries:
+            index[key] = entries
+        else:
+            index.pop(key, None)
+    return index, lines
+
+
+def _load_legacy_index():
+    legacy_obj, err = guard_path_cached(LEGACY_BACKUP_INDEX, for_write=False)
+    if err or not legacy_obj.exists():
+        return None
+    try:
+        with open(legacy_obj, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
 def _load_index():
-    idx_obj, err = guard_path(BACKUP_INDEX, must_exist=False, for_write=False)
+    idx_obj, err = guard_path_cached(BACKUP_INDEX, for_write=False)
     if err:
         return {}
-    if idx_obj and idx_obj.exists():
+    sig = _index_sig(idx_obj)
+    if sig is None:
+        # 旧版整文件 JSON 索引：首次读取时迁移为 JSONL
+        legacy = _load_legacy_index()
+        if not legacy:
+            return {}
         try:
-            with open(idx_obj, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            _save_index(legacy)
         except Exception:
-            pass
-    return {}
+            return legacy
+        sig = _index_sig(idx_obj)
+    if sig != _index_cache["sig"]:
+        try:
+            index, lines = _read_index_file(idx_obj)
+        except Exception:
+            return {}
+        _index_cache.update(sig=sig, index=index, lines=lines)
+    # 返回副本，调用方修改后需经 _append_index / _save_index 落盘
+    return {k: list(v) for k, v in _index_cache["index"].items()}
 
 
 def _save_index(index):
-    idx_obj, err = guard_path(BACKUP_INDEX, must_exist=False, for_write=True)
+    """Rewrite the whole index in compact form (one line per key)."""
+    idx_obj, err = guard_path_cached(BACKUP_INDEX, for_write=True)
     if err:
         raise ValueError(err)
     if not idx_obj.parent.exists():
         idx_obj.parent.mkdir(parents=True, exist_ok=True)
-    with open(idx_obj, 'w', encoding='utf-8') as f:
-        json.dump(index, f, ensure_ascii=False, indent=2)
+    index = {k: list(v) for k, v in index.items() if v}
+    tmp_obj = idx_obj.with_name(idx_obj.name + ".tmp")
+    with open(tmp_obj, 'wb') as f:
+        f.write(b"".join(_encode_line(key, entries) for key, entries in index.items()))
+    os.replace(tmp_obj, idx_obj)
+    _index_cache.update(sig=_index_sig(idx_obj), index=index, lines=len(index))
+
+
+def _append_index(key, entries):
+    """Record the new entry list of one key by appending a single line."""
+    idx_obj, err = guard_path_cached(BACKUP_INDEX, for_write=True)
+    if err:
+        raise ValueError(err)
+    if not idx_obj.parent.exists():
+        idx_obj.parent.mkdir(parents=True, exist_ok=True)
+    # 一次 open + 单次 O_APPEND write，前后 fstat 取代两次按路径 stat
+    fd = os.open(idx_obj, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        st = os.fstat(fd)
+        fresh = (st.st_mtime_ns, st.st_size) == _index_cache["sig"]
+        os.write(fd, _encode_line(key, entries))
+        st = os.fstat(fd)
+    finally:
+        os.close(fd)
+    if not fresh:
+        # 其他进程改过索引，下次读取时整体重载
+        _index_cache["sig"] = None
+        return
+    index = _index_cache["index"]
+    if entries:
+        index[key] = list(entries)
+    else:
+        index.pop(key, None)
+    _index_cache["lines"] += 1
+    _index_cache["sig"] = (st.st_mtime_ns, st.st_size)
+    if _index_cache["lines"] > INDEX_COMPACT_RATIO * max(1, len(index)):
+        _save_index(index)
 
 
 def _file_key(file_path: Path) -> str:
@@ -61,6 +187,132 @@ def _file_key(file_path: Path) -> str:
         return str(file_path.resolve())
 
 
+def _file_digest(path) -> bytes:
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "blake2b").digest()
+        h = hashlib.blake2b()
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+        return h.digest()
+
+
+def _link_if_unchanged(src, src_size: int, last_backup: Path, target: Path) -> bool:
+    """Hardlink target to last_backup when src (a path or a bytes snapshot) has identical content."""
+    try:
+        if last_backup == target or last_backup.stat().st_size != src_size:
+            return False
+        src_digest = hashlib.blake2b(src).digest() if isinstance(src, bytes) else _file_digest(src)
+        if src_digest != _file_digest(last_backup):
+            return False
+        os.link(last_backup, target)
+        return True
+    except (OSError, NotImplementedError):
+        return False
+
+
+def _prune_files(paths):
+    for old_path in paths:
+        try:
+            old_path.unlink()
+        except OSError:
+            pass  # 已不存在或被占用时忽略
+
+
+def _store_backup_file(file_path: Path, data, backup_obj: Path, src_stat=None):
+    """Write a new backup file via a temp file + os.replace, never into an existing inode.
+
+    For a bytes snapshot, src_stat (taken with the snapshot) supplies the mode and times copy2 would keep.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=backup_obj.parent, prefix="." + backup_obj.name + ".", suffix=".tmp")
+    try:
+        if data is None:
+            os.close(fd)
+            # copy2 已走内核零拷贝 (Linux sendfile / macOS fcopyfile / Windows CopyFile2)
+            shutil.copy2(str(file_path), tmp_name)
+        else:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            if src_stat is not None:
+                # undo_edit 用 copy2 恢复，备份的权限位会被带回原文件
+                os.chmod(tmp_name, stat.S_IMODE(src_stat.st_mode))
+                os.utime(tmp_name, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        os.replace(tmp_name, backup_obj)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _write_backup(file_path: Path, src_size: int, taken_at: float, data=None, src_stat=None) -> str:
+    """Store one backup of file_path. data is a bytes snapshot taken earlier (with its src_stat);
+    None copies the file now.
+
+    Caller must hold _BACKUP_LOCK.
+    """
+    backup_dir = _ensure_backup_dir()
+    key = _file_key(file_path)
+    taken = time.localtime(taken_at)
+    timestamp = time.strftime("%Y%m%d_%H%M%S", taken)
+
+    # Build safe backup filename: flatten path separators
+    safe_name = key.replace("/", "__").replace("\\", "__")
+    # 名字精确到微秒，仍冲突时追加序号：旧备份可能与其他备份硬链接共享 inode，绝不能覆盖
+    base_name = f"{safe_name}.{timestamp}_{int(taken_at * 1_000_000) % 1_000_000:06d}"
+    backup_name = f"{base_name}.bak"
+    seq = 1
+    while os.path.lexists(backup_dir / backup_name):
+        backup_name = f"{base_name}_{seq}.bak"
+        seq += 1
+
+    backup_obj, err = guard_path(str(backup_dir / backup_name), must_exist=False, for_write=True)
+    if err:
+        return ""
+
+    index = _load_index()
+    entries = index.setdefault(key, [])
+
+    # 内容与上一个备份相同则硬链接过去，省去整份拷贝；否则正常复制
+    src = file_path if data is None else data
+    linked = bool(entries) and _link_if_unchanged(
+        src, src_size, backup_dir / entries[-1]["backup_file"], backup_obj
+    )
+    if not linked:
+        _store_backup_file(file_path, data, backup_obj, src_stat)
+
+    # Update index
+    entries.append({
+        "backup_file": str(backup_obj.name),
+        "timestamp": timestamp,
+        "size": src_size,
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S", taken),
+    })
+
+    # Prune old backups: the index is trimmed now, the unlinks run off-thread
+    if len(entries) > MAX_BACKUPS_PER_FILE:
+        removed = entries[:-MAX_BACKUPS_PER_FILE]
+        entries[:] = entries[-MAX_BACKUPS_PER_FILE:]
+        # 旧版按秒命名的备份可能同名，仍被保留的文件不能删
+        kept = {e["backup_file"] for e in entries}
+        stale = [backup_dir / old["backup_file"] for old in removed if old["backup_file"] not in kept]
+        if stale:
+            threading.Thread(target=_prune_files, args=(stale,), daemon=True).start()
+
+    _append_index(key, entries)
+    return str(backup_obj)
+
+
+def _regular_file_stat(file_path: Path):
+    # 一次 stat 同时判断存在性/类型并取得大小
+    try:
+        src_stat = file_path.stat()
+    except OSError:
+        return None
+    return src_stat if stat.S_ISREG(src_stat.st_mode) else None
+
+
 def create_backup(file_path) -> str:
     """Create a backup of file_path before editing. Returns backup path or empty string on failure.
     Called by edit_tools and other write tools before modifying files.
@@ -68,49 +320,45 @@ def create_backup(file_path) -> str:
     try:
         if isinstance(file_path, str):
             file_path = Path(file_path)
-
-        if not file_path.exists() or not file_path.is_file():
+        src_stat = _regular_file_stat(file_path)
+        if src_stat is None:
             return ""
+        with _BACKUP_LOCK:
+            return _write_backup(file_path, src_stat.st_size, time.time())
+    except Exception:
+        return ""
 
-        backup_dir = _ensure_backup_dir()
-        key = _file_key(file_path)
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
 
-        # Build safe backup filename: flatten path separators
-        safe_name = key.replace("/", "__").replace("\\", "__")
-        backup_name = f"{safe_name}.{timestamp}.bak"
+def _write_backup_quietly(file_path, src_size, taken_at, data, src_stat):
+    try:
+        with _BACKUP_LOCK:
+            _write_backup(file_path, src_size, taken_at, data, src_stat)
+    except Exception:
+        pass  # 与 create_backup 一致：备份失败不影响编辑
 
-        backup_obj, err = guard_path(str(backup_dir / backup_name), must_exist=False, for_write=True)
-        if err:
-            return ""
 
-        shutil.copy2(str(file_path), str(backup_obj))
-
-        # Update index
-        index = _load_index()
-        entries = index.setdefault(key, [])
-        entries.append({
-            "backup_file": str(backup_obj.name),
-            "timestamp": timestamp,
-            "size": file_path.stat().st_size,
-            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-        })
-
-        # Prune old backups
-        if len(entries) > MAX_BACKUPS_PER_FILE:
-            removed = entries[:-MAX_BACKUPS_PER_FILE]
-            entries[:] = entries[-MAX_BACKUPS_PER_FILE:]
-            for old in removed:
-                old_path = backup_dir / old["backup_file"]
-                if old_path.exists():
-                    old_path.unlink()
-
-        index[key] = entries
-        _save_index(index)
-        return str(backup_obj)
+def create_backup_async(file_path) -> bool:
+    """Snapshot file_path's bytes now and write the backup on the background thread.
 
+    The caller may overwrite the file as soon as this returns. Returns False if nothing was queued.
+    """
+    try:
+        if isinstance(file_path, str):
+            file_path = Path(file_path)
+        src_stat = _regular_file_stat(file_path)
+        if src_stat is None:
+            return False
+        data = file_path.read_bytes()
+        _BACKUP_EXECUTOR.submit(_write_backup_quietly, file_path, len(data), time.time(), data, src_stat)
+        return True
     except Exception:
-        return ""
+        return False
+
+
+def flush_backups():
+    """Wait until every backup queued by create_backup_async has been written."""
+    # 单线程按顺序执行，空任务完成即说明之前的备份都已落盘
+    _BACKUP_EXECUTOR.submit(lambda: None).result()
 
 
 # ==========================================
@@ -139,12 +387,14 @@ backup_history_schema = {
 def backup_history(filepath: str):
     """查看文件的备份历史"""
     try:
+        flush_backups()
         file_obj, err = guard_path(filepath, must_exist=False, for_write=False)
         if err:
             return err
 
         key = _file_key(file_obj)
-        index = _load_index()
+        with _BACKUP_LOCK:
+            index = _load_index()
         entries = index.get(key, [])
 
         if not entries:
@@ -196,12 +446,14 @@ undo_edit_schema = {
 def undo_edit(filepath: str, version: int = 1):
     """撤销编辑，恢复备份"""
     try:
+        flush_backups()
         file_obj, err = guard_path(filepath, must_exist=False, for_write=True)
         if err:
             return err
 
         key = _file_key(file_obj)
-        index = _load_index()
+        with _BACKUP_LOCK:
+            index = _load_index()
         entries = index.get(key, [])
 
         if not entries:
@@ -257,38 +509,41 @@ backup_clean_schema = {
 def backup_clean(filepath: str = "", keep: int = 3):
     """清理备份"""
     try:
+        flush_backups()
         keep = max(0, min(int(keep) if keep else 3, MAX_BACKUPS_PER_FILE))
         backup_dir = _ensure_backup_dir()
-        index = _load_index()
-
-        if filepath:
-            file_obj, err = guard_path(filepath, must_exist=False, for_write=False)
-            if err:
-                return err
-            key = _file_key(file_obj)
-            keys_to_clean = [key] if key in index else []
-        else:
-            keys_to_clean = list(index.keys())
-
-        if not keys_to_clean:
-            return "📂 没有可清理的备份"
-
-        total_removed = 0
-        for key in keys_to_clean:
-            entries = index.get(key, [])
-            if len(entries) <= keep:
-                continue
-            to_remove = entries[:-keep] if keep > 0 else entries
-            for old in to_remove:
-                old_path = backup_dir / old["backup_file"]
-                if old_path.exists():
-                    old_path.unlink()
-                    total_removed += 1
-            index[key] = entries[-keep:] if keep > 0 else []
-
-        # Remove empty keys
-        index = {k: v for k, v in index.items() if v}
-        _save_index(index)
+        # 整个 读取-筛选-写回 过程持锁：否则这期间后台写入的索引行会被整理覆盖丢失
+        with _BACKUP_LOCK:
+            index = _load_index()
+
+            if filepath:
+                file_obj, err = guard_path(filepath, must_exist=False, for_write=False)
+                if err:
+                    return err
+                key = _file_key(file_obj)
+                keys_to_clean = [key] if key in index else []
+            else:
+                keys_to_clean = list(index.keys())
+
+            if not keys_to_clean:
+                return "📂 没有可清理的备份"
+
+            total_removed = 0
+            for key in keys_to_clean:
+                entries = index.get(key, [])
+                if len(entries) <= keep:
+                    continue
+                to_remove = entries[:-keep] if keep > 0 else entries
+                for old in to_remove:
+                    old_path = backup_dir / old["backup_file"]
+                    if old_path.exists():
+                        old_path.unlink()
+                        total_removed += 1
+                index[key] = entries[-keep:] if keep > 0 else []
+
+            # Remove empty keys
+            index = {k: v for k, v in index.items() if v}
+            _save_index(index)
 
         scope = f"文件 '{filepath}'" if filepath else "全部文件"
         return f"✅ 已清理 {scope} 的备份：删除 {total_removed} 个旧版本，每文件保留最近 {keep} 个"
@@ -2,11 +2,20 @@
 # 日常信息管理工具：待办事项、笔记、提醒
 
 import os
+import re
 import json
+import mmap
 import time
+import operator
+import threading
 from pathlib import Path
 from .registry import register
-from .path_safety import guard_path, WORKSPACE_ROOT
+from .path_safety import guard_path_cached, WORKSPACE_ROOT
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 DATA_DIR = "data"
 
@@ -23,7 +32,7 @@ def _safe_note_title(title: str) -> str:
 
 
 def _ensure_data_dir():
-    data_obj, err = guard_path(DATA_DIR, must_exist=False, for_write=True)
+    data_obj, err = guard_path_cached(DATA_DIR, for_write=True)
     if err:
         raise ValueError(err)
     if not data_obj.exists():
@@ -33,12 +42,15 @@ def _ensure_data_dir():
 
 def _load_json(filename, default=None):
     data_obj = _ensure_data_dir()
-    file_obj, err = guard_path(str(data_obj / filename), must_exist=False, for_write=False)
+    file_obj, err = guard_path_cached(str(data_obj / filename), for_write=False)
     if err:
         return default if default is not None else {}
 
     if file_obj.exists():
         try:
+            if orjson is not None:
+                with open(file_obj, 'rb') as f:
+                    return orjson.loads(f.read())
             with open(file_obj, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception:
@@ -46,13 +58,109 @@ def _load_json(filename, default=None):
     return default if default is not None else {}
 
 
+def _encode_json(data) -> str:
+    # 写盘保持 json 的原有格式（文本模式换行、Infinity 等），orjson 只用于读取
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
 def _save_json(filename, data):
     data_obj = _ensure_data_dir()
-    file_obj, err = guard_path(str(data_obj / filename), must_exist=False, for_write=True)
+    file_obj, err = guard_path_cached(str(data_obj / filename), for_write=True)
     if err:
         raise ValueError(err)
     with open(file_obj, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write(_encode_json(data))
+
+
+REMINDERS_FILE = "reminders.json"
+_REMIND_TIME_RE = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}")
+# remind_time 无法解析的旧记录：排在最后且永不到期
+_NEVER_TS = float("inf")
+# 列表状态图标，按 (未到期, 已到期, 已触发) 下标取
+_REMIND_STATUS = ("🟡", "🔴", "✅")
+_remind_ts_key = operator.itemgetter("remind_ts")
+
+# 已解析的提醒，以 {id: reminder} 存放，按文件 (mtime_ns, size) 失效；push_tools 等外部写入后自动重读。
+# dirty 只在一次 reminder_manage 调用内部为真：多处修改合并成调用结束时的一次写盘
+_REM_CACHE = {"sig": None, "data": None, "dirty": False}
+_REM_LOCK = threading.Lock()
+
+
+def _reminders_sig(file_obj):
+    try:
+        st = file_obj.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _remind_ts(remind_time):
+    """Parse 'YYYY-MM-DD HH:MM' (local time) into an epoch int, or None if invalid."""
+    try:
+        return int(time.mktime(time.strptime(remind_time, "%Y-%m-%d %H:%M")))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _reminder_store():
+    """Return the cached {id: reminder} dict, re-parsing only when the file changed.
+
+    Caller must hold _REM_LOCK; mutations must be followed by _mark_reminders_dirty()
+    and _flush_reminders() before the lock is released.
+    """
+    if _REM_CACHE["dirty"]:
+        return _REM_CACHE["data"]
+    data_obj = _ensure_data_dir()
+    file_obj, err = guard_path_cached(str(data_obj / REMINDERS_FILE), for_write=False)
+    if err:
+        raise ValueError(err)
+    sig = _reminders_sig(file_obj)
+    if sig is None:
+        _REM_CACHE.update(sig=None, data={})
+    elif sig != _REM_CACHE["sig"]:
+        data = _load_json(REMINDERS_FILE, [])
+        if not isinstance(data, list):
+            data = []
+        # 旧数据没有 remind_ts，读入时补上，随下一次写盘持久化
+        for r in data:
+            if "remind_ts" not in r:
+                ts = _remind_ts(r.get("remind_time"))
+                if ts is not None:
+                    r["remind_ts"] = ts
+        _REM_CACHE.update(sig=sig, data={r.get("id", 0): r for r in data})
+    return _REM_CACHE["data"]
+
+
+def _load_reminders():
+    """Return a private copy of the reminder list."""
+    with _REM_LOCK:
+        # 每条提醒是扁平 dict，浅拷贝即可隔离调用方的修改
+        return [dict(r) for r in _reminder_store().values()]
+
+
+def _mark_reminders_dirty():
+    """Flag the in-memory store as newer than disk. Caller must hold _REM_LOCK."""
+    _REM_CACHE["dirty"] = True
+
+
+def _flush_reminders():
+    """Write pending reminder changes to disk (tmp file + os.replace). Caller must hold _REM_LOCK."""
+    if not _REM_CACHE["dirty"]:
+        return
+    try:
+        data_obj = _ensure_data_dir()
+        file_obj, err = guard_path_cached(str(data_obj / REMINDERS_FILE), for_write=True)
+        if err:
+            raise ValueError(err)
+        tmp_obj = file_obj.with_name(file_obj.name + ".tmp")
+        with open(tmp_obj, 'w', encoding='utf-8') as f:
+            f.write(_encode_json(list(_REM_CACHE["data"].values())))
+        os.replace(tmp_obj, file_obj)
+    except BaseException:
+        # 没写进去的修改作废，下次从磁盘重读，不会拿旧内存覆盖别的进程的写入
+        _REM_CACHE.update(sig=None, data=None, dirty=False)
+        raise
+    _REM_CACHE.update(sig=_reminders_sig(file_obj), dirty=False)
 
 
 # ==========================================
@@ -193,10 +301,55 @@ note_manage_schema = {
 }
 
 
+def _append_note(note_obj, payload: bytes):
+    """Append bytes with a single O_APPEND write; the fd is not kept open."""
+    fd = os.open(note_obj, os.O_WRONLY | os.O_APPEND | getattr(os, "O_BINARY", 0))
+    try:
+        os.write(fd, payload)
+    finally:
+        os.close(fd)
+
+
+def _search_note_text(text, query_lower):
+    if query_lower not in text.lower():
+        return None
+    for i, line in enumerate(text.split('\n')):
+        if query_lower in line.lower():
+            return i + 1, line.strip()
+    return None
+
+
+def _search_note(note_obj, query):
+    """Return (line_no, line) of the first line containing query, or None."""
+    query_lower = query.lower()
+    query_b = query_lower.encode('utf-8')
+    # bytes.lower 只处理 ASCII：查询含非 ASCII 的大小写字母或换行时走原 str 路径
+    if (not query.isascii() and query_lower != query.upper()) or b'\n' in query_b:
+        with open(note_obj, 'r', encoding='utf-8') as f:
+            return _search_note_text(f.read(), query_lower)
+
+    with open(note_obj, 'rb') as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # 查询不含字母（如纯中文/数字）时直接在映射上检索，否则转小写一次
+            data = mm if query_b.lower() == query_b.upper() else mm[:].lower()
+            idx = data.find(query_b)
+            if idx < 0:
+                return None
+            line_start = data.rfind(b'\n', 0, idx) + 1
+            line_end = data.find(b'\n', idx)
+            if line_end < 0:
+                line_end = len(data)
+            line_no = mm[:line_start].count(b'\n') + 1
+            line = mm[line_start:line_end].decode('utf-8', errors='replace')
+    return line_no, line.strip()
+
+
 @register(note_manage_schema)
 def note_manage(action: str, title: str = "", content: str = "", query: str = ""):
     try:
-        notes_dir_obj, err = guard_path(os.path.join(DATA_DIR, "notes"), must_exist=False, for_write=True)
+        notes_dir_obj, err = guard_path_cached(os.path.join(DATA_DIR, "notes"), for_write=True)
         if err:
             return err
         if not notes_dir_obj.exists():
@@ -224,8 +377,11 @@ def note_manage(action: str, title: str = "", content: str = "", query: str = ""
             if not note_obj.exists():
                 return f"❌ 笔记不存在: {safe_title}"
             timestamp = time.strftime('%Y-%m-%d %H:%M')
-            with open(note_obj, 'a', encoding='utf-8') as f:
-                f.write(f"\n\n---\n\n[{timestamp}]\n\n{content}")
+            text = f"\n\n---\n\n[{timestamp}]\n\n{content}"
+            if os.linesep != "\n":
+                text = text.replace("\n", os.linesep)  # 与文本模式写入的换行保持一致
+            payload = text.encode('utf-8')
+            _append_note(note_obj, payload)
             return f"✅ 已追加到笔记: {safe_title}"
 
         elif action == "read":
@@ -250,29 +406,24 @@ def note_manage(action: str, title: str = "", content: str = "", query: str = ""
             for fname in os.listdir(notes_dir_obj):
                 if not fname.endswith('.md'):
                     continue
-                note_obj = notes_dir_obj / fname
-                with open(note_obj, 'r', encoding='utf-8') as f:
-                    text = f.read()
-                if query.lower() in text.lower():
-                    # 找到包含关键词的行
-                    for i, line in enumerate(text.split('\n')):
-                        if query.lower() in line.lower():
-                            results.append(f"  📄 {fname}:{i+1} → {line.strip()}")
-                            break
+                # 找到包含关键词的行
+                hit = _search_note(notes_dir_obj / fname, query)
+                if hit:
+                    results.append(f"  📄 {fname}:{hit[0]} → {hit[1]}")
             if not results:
                 return f"🔍 未找到包含 '{query}' 的笔记"
             return f"🔍 搜索 '{query}' 找到 {len(results)} 条匹配:\n" + "\n".join(results)
 
         elif action == "list":
-            files = [f for f in os.listdir(notes_dir_obj) if f.endswith('.md')]
+            # scandir 的 DirEntry 复用目录遍历结果，每个笔记只需一次 stat
+            with os.scandir(notes_dir_obj) as it:
+                files = [(e.name, e.stat()) for e in it if e.name.endswith('.md')]
             if not files:
                 return "📝 暂无笔记"
             lines = ["📝 笔记列表:\n"]
-            for f in sorted(files):
-                note_obj = notes_dir_obj / f
-                size = note_obj.stat().st_size
-                mtime = time.strftime("%m-%d %H:%M", time.localtime(note_obj.stat().st_mtime))
-                lines.append(f"  📄 {f} ({size}B, {mtime})")
+            for f, st in sorted(files):
+                mtime = time.strftime("%m-%d %H:%M", time.localtime(st.st_mtime))
+                lines.append(f"  📄 {f} ({st.st_size}B, {mtime})")
             return "\n".join(lines)
 
         elif action == "delete":
@@ -322,57 +473,69 @@ reminder_schema = {
 @register(reminder_schema)
 def reminder_manage(action: str, content: str = "", remind_time: str = "", reminder_id: int = 0):
     try:
-        reminders = _load_json("reminders.json", [])
+        now_ts = int(time.time() // 60 * 60)
 
         if action == "add":
             if not content or not remind_time:
                 return "❌ 请提供提醒内容和时间"
             # 验证时间格式
-            import re as _re
-            if not _re.fullmatch(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}", remind_time.strip()):
+            if not _REMIND_TIME_RE.fullmatch(remind_time.strip()):
                 return "❌ 时间格式必须为 YYYY-MM-DD HH:MM，例如 2025-03-01 09:00"
             remind_time = remind_time.strip()
-            new_id = max([r.get("id", 0) for r in reminders], default=0) + 1
-            reminder = {
-                "id": new_id,
-                "content": content,
-                "remind_time": remind_time,
-                "created": time.strftime("%Y-%m-%d %H:%M"),
-                "triggered": False
-            }
-            reminders.append(reminder)
-            _save_json("reminders.json", reminders)
+            remind_ts = _remind_ts(remind_time)
+            if remind_ts is None:
+                return f"❌ 无效的提醒时间: {remind_time}"
+            with _REM_LOCK:
+                store = _reminder_store()
+                new_id = max(store, default=0) + 1
+                store[new_id] = {
+                    "id": new_id,
+                    "content": content,
+                    "remind_time": remind_time,
+                    "remind_ts": remind_ts,
+                    "created": time.strftime("%Y-%m-%d %H:%M"),
+                    "triggered": False
+                }
+                _mark_reminders_dirty()
+                _flush_reminders()
             return f"✅ 已添加提醒 #{new_id}: {content} (时间: {remind_time})"
 
         elif action == "list":
+            reminders = _load_reminders()
             if not reminders:
                 return "⏰ 暂无提醒"
-            lines = ["⏰ 提醒列表:\n"]
-            now = time.strftime("%Y-%m-%d %H:%M")
-            for r in sorted(reminders, key=lambda x: x.get("remind_time", "")):
-                status = "✅" if r.get("triggered") else ("🔴" if r["remind_time"] <= now else "🟡")
-                lines.append(f"  {status} #{r['id']} [{r['remind_time']}] {r['content']}")
+            # list 不写盘，给解析失败的旧记录补上的哨兵值不会落盘
+            for r in reminders:
+                r.setdefault("remind_ts", _NEVER_TS)
+            lines = ["⏰ 提醒列表:\n"] + [
+                f"  {_REMIND_STATUS[2 if r.get('triggered') else r['remind_ts'] <= now_ts]} "
+                f"#{r['id']} [{r['remind_time']}] {r['content']}"
+                for r in sorted(reminders, key=_remind_ts_key)
+            ]
             return "\n".join(lines)
 
         elif action == "delete":
             reminder_id = int(reminder_id) if reminder_id else 0
-            before = len(reminders)
-            reminders = [r for r in reminders if r["id"] != reminder_id]
-            if len(reminders) == before:
-                return f"❌ 未找到提醒 #{reminder_id}"
-            _save_json("reminders.json", reminders)
+            with _REM_LOCK:
+                if _reminder_store().pop(reminder_id, None) is None:
+                    return f"❌ 未找到提醒 #{reminder_id}"
+                _mark_reminders_dirty()
+                _flush_reminders()
             return f"✅ 已删除提醒 #{reminder_id}"
 
         elif action == "check":
-            now = time.strftime("%Y-%m-%d %H:%M")
-            due = [r for r in reminders if not r.get("triggered") and r["remind_time"] <= now]
-            if not due:
-                return "✅ 暂无到期提醒"
-            lines = [f"🔔 有 {len(due)} 条到期提醒:\n"]
-            for r in due:
-                r["triggered"] = True
-                lines.append(f"  🔔 #{r['id']} {r['content']} (设定于 {r['remind_time']})")
-            _save_json("reminders.json", reminders)
+            with _REM_LOCK:
+                due = [r for r in _reminder_store().values()
+                       if not r.get("triggered") and r.get("remind_ts", _NEVER_TS) <= now_ts]
+                if not due:
+                    return "✅ 暂无到期提醒"
+                for r in due:
+                    r["triggered"] = True
+                _mark_reminders_dirty()
+                _flush_reminders()
+                lines = [f"🔔 有 {len(due)} 条到期提醒:\n"] + [
+                    f"  🔔 #{r['id']} {r['content']} (设定于 {r['remind_time']})" for r in due
+                ]
             return "\n".join(lines)
 
         else:
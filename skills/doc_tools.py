@@ -2,6 +2,10 @@
 # 文献阅读与翻译工具：PDF 解析、文档摘要、翻译
 
 import os
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from .registry import register
 from .path_safety import guard_path, WORKSPACE_ROOT
@@ -14,6 +18,60 @@ def _display_path(path_obj: Path):
         return str(path_obj)
 
 
+# 翻译 / 摘要的 AI 回复缓存（LRU）。只缓存成功的回复，失败的调用下次仍会重试。
+AI_CACHE_MAX = 256
+_AI_CACHE: "OrderedDict[tuple, str]" = OrderedDict()
+_AI_CACHE_LOCK = threading.Lock()
+
+
+# external_ai._format_usage 追加在回复末尾的用量行；它只属于当次调用，缓存时去掉
+_USAGE_FOOTER = "\n\n📊 Token 用量:"
+_CACHED_FOOTER = "\n\n📊 缓存结果，本次未调用 API"
+
+
+def _ai_cache_get(key):
+    with _AI_CACHE_LOCK:
+        result = _AI_CACHE.get(key)
+        if result is None:
+            return None
+        _AI_CACHE.move_to_end(key)
+    return result + _CACHED_FOOTER
+
+
+def _ai_cache_put(key, result: str):
+    idx = result.rfind(_USAGE_FOOTER)
+    if idx >= 0:
+        result = result[:idx]
+    with _AI_CACHE_LOCK:
+        _AI_CACHE[key] = result
+        _AI_CACHE.move_to_end(key)
+        while len(_AI_CACHE) > AI_CACHE_MAX:
+            _AI_CACHE.popitem(last=False)
+
+
+# 超过这个长度的翻译输入按段落切块，并发请求
+TRANSLATE_CHUNK_CHARS = 6000
+
+
+def _split_paragraphs(text: str, limit: int):
+    """Split text at blank lines into chunks of at most limit chars; an overlong paragraph is cut hard."""
+    chunks = []
+    current = None
+    for para in text.split("\n\n"):
+        while len(para) > limit:
+            if current is not None:
+                chunks.append(current)
+                current = None
+            chunks.append(para[:limit])
+            para = para[limit:]
+        if current is not None and len(current) + 2 + len(para) > limit:
+            chunks.append(current)
+            current = None
+        current = para if current is None else f"{current}\n\n{para}"
+    chunks.append(current)
+    return chunks
+
+
 # ==========================================
 # 1. 翻译工具
 # ==========================================
@@ -45,7 +103,7 @@ translate_schema = {
 def translate(text: str, target_lang: str = "中文", style: str = "free"):
     """使用 AI 翻译文本"""
     try:
-        from .external_ai import call_ai
+        from .external_ai import call_ai, call_ai_batch
 
         style_map = {
             "literal": "逐字逐句直译，保持原文结构",
@@ -55,15 +113,34 @@ def translate(text: str, target_lang: str = "中文", style: str = "free"):
         }
         style_desc = style_map.get(style, style_map["free"])
 
+        # 用摘要代替原文做 key，避免长文本常驻在缓存键里
+        cache_key = ("translate", hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest(), target_lang, style_desc)
+        cached = _ai_cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         system = f"你是专业翻译。将用户提供的文本翻译为{target_lang}。翻译风格：{style_desc}。只输出翻译结果，不要解释。"
 
-        result = call_ai(
-            prompt=text,
-            provider="kimi",
-            system_prompt=system,
-            temperature=0.3,
-            max_tokens=8000
-        )
+        chunks = _split_paragraphs(text, TRANSLATE_CHUNK_CHARS)
+        if len(chunks) == 1:
+            result = call_ai(
+                prompt=text,
+                provider="kimi",
+                system_prompt=system,
+                temperature=0.3,
+                max_tokens=8000
+            )
+        else:
+            # 长文本按段落分块并发翻译，按原顺序拼回
+            result = call_ai_batch(
+                chunks,
+                provider="kimi",
+                system_prompt=system,
+                temperature=0.3,
+                max_tokens=8000
+            )
+        if not result.startswith("❌"):
+            _ai_cache_put(cache_key, result)
         return result
 
     except Exception as e:
@@ -95,6 +172,63 @@ read_pdf_schema = {
 }
 
 
+@lru_cache(maxsize=32)
+def _extract_pdf_text(path: str, mtime_ns: int, start_page: int, end_page: int, max_chars: int):
+    """Extract page text; mtime_ns is only part of the cache key so edited files are re-parsed.
+
+    Returns (total_pages, start, end, full_text), full_text being "" when nothing was extractable.
+    """
+    import PyPDF2
+
+    with open(path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        total_pages = len(reader.pages)
+
+        start = max(1, start_page) - 1
+        end = min(end_page or total_pages, total_pages)
+
+        pages_text = []
+        text_len = -2  # join 的 "\n\n" 分隔符比页数少一个
+        for i in range(start, end):
+            text = reader.pages[i].extract_text()
+            if text:
+                page = f"--- 第 {i+1} 页 ---\n{text}"
+                pages_text.append(page)
+                text_len += len(page) + 2
+                if text_len > max_chars:
+                    break  # 后面的页反正会被截掉，不再解析
+
+    full_text = "\n\n".join(pages_text)
+    if len(full_text) > max_chars:
+        full_text = full_text[:max_chars] + f"\n\n... (已截断，仅显示前 {max_chars} 字符，读到第 {i+1} 页)"
+    return total_pages, start, end, full_text
+
+
+def _read_pdf_impl(file_obj: Path, start_page, end_page, max_chars: int):
+    """read_pdf body for a path that has already passed guard_path and the .pdf check."""
+    try:
+        try:
+            import PyPDF2  # noqa: F401
+        except ImportError:
+            return "❌ 需要安装 PyPDF2: pip install PyPDF2"
+
+        total_pages, start, end, full_text = _extract_pdf_text(
+            str(file_obj),
+            file_obj.stat().st_mtime_ns,
+            int(start_page) if start_page else 1,
+            int(end_page) if end_page else 0,
+            max_chars,
+        )
+
+        if not full_text:
+            return f"⚠️ PDF 无法提取文本 (可能是扫描版): {_display_path(file_obj)}"
+
+        return f"📄 PDF: {_display_path(file_obj)} ({total_pages} 页, 读取第 {start+1}-{end} 页)\n\n{full_text}"
+
+    except Exception as e:
+        return f"❌ PDF 读取失败: {e}"
+
+
 @register(read_pdf_schema)
 def read_pdf(filepath: str, start_page: int = 1, end_page: int = 0, max_chars: int = 10000):
     """读取 PDF 文件"""
@@ -107,35 +241,8 @@ def read_pdf(filepath: str, start_page: int = 1, end_page: int = 0, max_chars: i
         if file_obj.suffix.lower() != '.pdf':
             return f"❌ 不是 PDF 文件: {_display_path(file_obj)}"
 
-        try:
-            import PyPDF2
-        except ImportError:
-            return "❌ 需要安装 PyPDF2: pip install PyPDF2"
-
         max_chars = min(int(max_chars) if max_chars else 10000, 50000)
-
-        with open(file_obj, 'rb') as f:
-            reader = PyPDF2.PdfReader(f)
-            total_pages = len(reader.pages)
-
-            start = max(1, int(start_page) if start_page else 1) - 1
-            end = int(end_page) if end_page else total_pages
-            end = min(end, total_pages)
-
-            pages_text = []
-            for i in range(start, end):
-                text = reader.pages[i].extract_text()
-                if text:
-                    pages_text.append(f"--- 第 {i+1} 页 ---\n{text}")
-
-        if not pages_text:
-            return f"⚠️ PDF 无法提取文本 (可能是扫描版): {_display_path(file_obj)}"
-
-        full_text = "\n\n".join(pages_text)
-        if len(full_text) > max_chars:
-            full_text = full_text[:max_chars] + f"\n\n... (已截断，共约 {len(full_text)} 字符)"
-
-        return f"📄 PDF: {_display_path(file_obj)} ({total_pages} 页, 读取第 {start+1}-{end} 页)\n\n{full_text}"
+        return _read_pdf_impl(file_obj, start_page, end_page, max_chars)
 
     except Exception as e:
         return f"❌ PDF 读取失败: {e}"
@@ -144,6 +251,8 @@ def read_pdf(filepath: str, start_page: int = 1, end_page: int = 0, max_chars: i
 # ==========================================
 # 3. 文档摘要
 # ==========================================
+SUMMARY_MAX_CHARS = 15000
+
 summarize_doc_schema = {
     "type": "function",
     "function": {
@@ -178,27 +287,35 @@ def summarize_document(filepath: str, summary_type: str = "detailed", language:
         if file_obj.is_dir():
             return f"❌ 请输入文档文件路径，当前是目录: {_display_path(file_obj)}"
 
+        # 同一文件版本、同一摘要要求直接复用上次结果，连文件都不用再读
+        st = file_obj.stat()
+        cache_key = ("summary", str(file_obj), st.st_mtime_ns, st.st_size, summary_type, language)
+        cached = _ai_cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         # 读取文档内容
         ext = file_obj.suffix.lower()
         content = ""
 
         if ext == '.pdf':
-            result = read_pdf(str(file_obj), max_chars=15000)
+            result = _read_pdf_impl(file_obj, 1, 0, SUMMARY_MAX_CHARS)
             if result.startswith("❌"):
                 return result
             content = result
         else:
             try:
                 with open(file_obj, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                    # 多读一个字符就能判断是否需要截断，不必把大文件整个读进来
+                    content = f.read(SUMMARY_MAX_CHARS + 1)
             except UnicodeDecodeError:
                 return f"❌ 无法读取文件 (非文本格式): {_display_path(file_obj)}"
 
         if not content.strip():
             return f"⚠️ 文件内容为空: {filepath}"
 
-        if len(content) > 15000:
-            content = content[:15000] + "\n\n[内容已截断...]"
+        if len(content) > SUMMARY_MAX_CHARS:
+            content = content[:SUMMARY_MAX_CHARS] + "\n\n[内容已截断...]"
 
         type_prompts = {
             "brief": f"用{language}写一段100字以内的简要摘要。",
@@ -216,7 +333,10 @@ def summarize_document(filepath: str, summary_type: str = "detailed", language:
             temperature=0.3,
             max_tokens=4096
         )
-        return f"📝 文档摘要: {_display_path(file_obj)}\n{result}"
+        summary = f"📝 文档摘要: {_display_path(file_obj)}\n{result}"
+        if not result.startswith("❌"):
+            _ai_cache_put(cache_key, summary)
+        return summary
 
     except Exception as e:
         return f"❌ 摘要生成失败: {e}"
@@ -1,10 +1,16 @@
 # skills/edit_tools.py
 # 精确编辑工具：支持 find & replace，不再需要整文件覆盖
 
+import os
+import shutil
 import difflib
+import tempfile
 from .registry import register
 from .path_safety import guard_path, WORKSPACE_ROOT
-from .backup_tools import create_backup
+from .backup_tools import create_backup_async
+
+# 新旧内容合计超过该字符数时跳过 diff，只报告行数变化
+DIFF_MAX_CHARS = 200_000
 
 # ==========================================
 # 1. 精确编辑 (Find & Replace)
@@ -32,6 +38,10 @@ edit_file_schema = {
                 "new_text": {
                     "type": "string",
                     "description": "替换后的新文本"
+                },
+                "include_diff": {
+                    "type": "boolean",
+                    "description": "是否在结果中返回 diff，默认 true；超大文件会自动只返回行数变化"
                 }
             },
             "required": ["filename", "old_text", "new_text"]
@@ -55,8 +65,51 @@ def generate_diff(old_content: str, new_content: str, filename: str) -> str:
     return "".join(diff)
 
 
+def _write_text(file_obj, content: str):
+    """先写同目录临时文件再 os.replace，中途崩溃也不会留下写了一半的文件"""
+    # mkstemp 取唯一名字：不会覆盖用户的同名 .tmp 文件，并发编辑也互不干扰
+    fd, tmp_name = tempfile.mkstemp(dir=file_obj.parent, prefix="." + file_obj.name + ".", suffix=".tmp")
+    try:
+        # 大缓冲区：大文件一次写满，少几次 write 系统调用
+        with open(fd, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.write(content)
+        shutil.copymode(file_obj, tmp_name)
+        os.replace(tmp_name, file_obj)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _find_unique(content: str, old_text: str):
+    """返回 (位置, 匹配数)：唯一匹配时匹配数为 1；多处匹配时才去完整计数"""
+    idx = content.find(old_text)
+    if idx < 0:
+        return -1, 0
+    if content.find(old_text, idx + len(old_text)) >= 0:
+        return -1, content.count(old_text)
+    return idx, 1
+
+
+def _line_count(content: str) -> int:
+    if not content:
+        return 0
+    return content.count("\n") + (0 if content.endswith("\n") else 1)
+
+
+def _diff_block(old_content: str, new_content: str, filename: str, include_diff: bool = True) -> str:
+    """返回 ```diff``` 代码块；不需要或文件过大时只给行数变化，省掉纯 Python 的 difflib"""
+    if include_diff and len(old_content) + len(new_content) <= DIFF_MAX_CHARS:
+        diff_text = generate_diff(old_content, new_content, filename)
+        return f"```diff\n{diff_text}```" if diff_text else ""
+    reason = "文件较大，" if include_diff else "按要求"
+    return f"({reason}未生成 diff：{_line_count(old_content)} 行 → {_line_count(new_content)} 行)"
+
+
 @register(edit_file_schema)
-def edit_file(filename: str, old_text: str, new_text: str):
+def edit_file(filename: str, old_text: str, new_text: str, include_diff: bool = True):
     """精确编辑：在文件中查找 old_text 并替换为 new_text"""
     try:
         file_obj, err = guard_path(filename, must_exist=True, for_write=True)
@@ -69,8 +122,8 @@ def edit_file(filename: str, old_text: str, new_text: str):
         with open(file_obj, 'r', encoding='utf-8') as f:
             content = f.read()
 
-        # 检查 old_text 是否存在
-        count = content.count(old_text)
+        # 检查 old_text 是否存在且唯一
+        idx, count = _find_unique(content, old_text)
         if count == 0:
             return (
                 f"❌ 未找到匹配文本。请先用 read_file 查看文件内容，"
@@ -81,18 +134,21 @@ def edit_file(filename: str, old_text: str, new_text: str):
                 f"⚠️ 找到 {count} 处匹配。为安全起见，请提供更长的上下文使匹配唯一。"
             )
 
+        # 替换前后文本相同即无变更，不必拼接新内容、生成 diff 或写盘
+        if new_text == old_text:
+            return f"ℹ️ 无变更，未写入文件 '{_display_path(file_obj)}'。"
+
         # 执行替换
-        new_content = content.replace(old_text, new_text, 1)
+        new_content = content[:idx] + new_text + content[idx + len(old_text):]
 
         # 生成 diff 供日志记录
-        diff_text = generate_diff(content, new_content, _display_path(file_obj))
+        diff_block = _diff_block(content, new_content, _display_path(file_obj), include_diff)
 
         # 备份并写入文件
-        create_backup(file_obj)
-        with open(file_obj, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        create_backup_async(file_obj)
+        _write_text(file_obj, new_content)
 
-        return f"✅ 已精确编辑 '{_display_path(file_obj)}'。\n\n变更摘要:\n```diff\n{diff_text}```"
+        return f"✅ 已精确编辑 '{_display_path(file_obj)}'。\n\n变更摘要:\n{diff_block}"
 
     except Exception as e:
         return f"❌ 编辑失败: {e}"
@@ -115,7 +171,8 @@ insert_text_schema = {
             "properties": {
                 "filename": {"type": "string", "description": "文件路径"},
                 "line_number": {"type": "integer", "description": "在第几行之后插入 (0=文件开头, -1=文件末尾)"},
-                "text": {"type": "string", "description": "要插入的文本内容"}
+                "text": {"type": "string", "description": "要插入的文本内容"},
+                "include_diff": {"type": "boolean", "description": "是否在结果中返回 diff，默认 true"}
             },
             "required": ["filename", "line_number", "text"]
         }
@@ -124,7 +181,7 @@ insert_text_schema = {
 
 
 @register(insert_text_schema)
-def insert_text(filename: str, line_number: int, text: str):
+def insert_text(filename: str, line_number: int, text: str, include_diff: bool = True):
     """在指定行号后插入文本"""
     try:
         file_obj, err = guard_path(filename, must_exist=True, for_write=True)
@@ -147,15 +204,17 @@ def insert_text(filename: str, line_number: int, text: str):
         if new_lines_to_insert and not new_lines_to_insert[-1].endswith('\n'):
             new_lines_to_insert[-1] += '\n'
 
+        if not new_lines_to_insert:
+            return f"ℹ️ 无变更，未写入文件 '{_display_path(file_obj)}'。"
+
         lines[insert_pos:insert_pos] = new_lines_to_insert
         new_content = "".join(lines)
 
-        create_backup(file_obj)
-        with open(file_obj, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        create_backup_async(file_obj)
+        _write_text(file_obj, new_content)
 
-        diff_text = generate_diff(old_content, new_content, _display_path(file_obj))
-        return f"✅ 已在 '{_display_path(file_obj)}' 插入 {len(new_lines_to_insert)} 行。\n```diff\n{diff_text}```"
+        diff_block = _diff_block(old_content, new_content, _display_path(file_obj), include_diff)
+        return f"✅ 已在 '{_display_path(file_obj)}' 插入 {len(new_lines_to_insert)} 行。\n{diff_block}"
 
     except Exception as e:
         return f"❌ 插入失败: {e}"
@@ -177,7 +236,8 @@ delete_lines_schema = {
             "properties": {
                 "filename": {"type": "string", "description": "文件路径"},
                 "start_line": {"type": "integer", "description": "起始行号 (从1开始)"},
-                "end_line": {"type": "integer", "description": "结束行号 (包含此行)"}
+                "end_line": {"type": "integer", "description": "结束行号 (包含此行)"},
+                "include_diff": {"type": "boolean", "description": "是否在结果中返回 diff，默认 true"}
             },
             "required": ["filename", "start_line", "end_line"]
         }
@@ -186,7 +246,7 @@ delete_lines_schema = {
 
 
 @register(delete_lines_schema)
-def delete_lines(filename: str, start_line: int, end_line: int):
+def delete_lines(filename: str, start_line: int, end_line: int, include_diff: bool = True):
     """删除指定范围的行"""
     try:
         file_obj, err = guard_path(filename, must_exist=True, for_write=True)
@@ -208,16 +268,15 @@ def delete_lines(filename: str, start_line: int, end_line: int):
 
         new_content = "".join(lines)
 
-        create_backup(file_obj)
-        with open(file_obj, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        create_backup_async(file_obj)
+        _write_text(file_obj, new_content)
 
         deleted_preview = "".join(deleted)
         if len(deleted_preview) > 500:
             deleted_preview = deleted_preview[:500] + "..."
 
-        diff_text = generate_diff(old_content, new_content, _display_path(file_obj))
-        return f"✅ 已删除 '{_display_path(file_obj)}' 第 {start_line}-{end_line} 行 (共 {end_line - start_line + 1} 行)。\n```diff\n{diff_text}```"
+        diff_block = _diff_block(old_content, new_content, _display_path(file_obj), include_diff)
+        return f"✅ 已删除 '{_display_path(file_obj)}' 第 {start_line}-{end_line} 行 (共 {end_line - start_line + 1} 行)。\n{diff_block}"
 
     except Exception as e:
         return f"❌ 删除失败: {e}"
@@ -254,7 +313,8 @@ multi_edit_schema = {
                 "allow_partial": {
                     "type": "boolean",
                     "description": "是否允许部分成功。默认 false（事务模式：只要有一处失败就不写入文件）"
-                }
+                },
+                "include_diff": {"type": "boolean", "description": "是否在结果中返回 diff，默认 true"}
             },
             "required": ["filename", "edits"]
         }
@@ -262,8 +322,40 @@ multi_edit_schema = {
 }
 
 
+def _plan_edits(content: str, edits: list):
+    """在原文上一次定位全部编辑，返回按位置排序的 [(start, end, new_text)]。
+
+    逐项替换的语义是"后一项在前一项改完的文本上匹配"。只有各项互不影响时
+    （原文中唯一、彼此相距足够远、前面的 new_text 不会与周围文本拼出后面的 old_text）
+    一次性拼接才与之等价；否则返回 None，由调用方逐项替换。
+    """
+    spans = []
+    for edit in edits:
+        old_text = edit.get("old_text", "")
+        if old_text == "":
+            return None
+        idx, count = _find_unique(content, old_text)
+        if count != 1:
+            return None
+        spans.append((idx, idx + len(old_text), old_text, edit.get("new_text", "")))
+
+    ordered = sorted(spans)
+    gap = max(len(span[2]) for span in spans)
+    for prev, cur in zip(ordered, ordered[1:]):
+        if cur[0] - prev[1] < gap:
+            return None
+
+    # 与第 j 项新文本重叠的匹配只可能落在这个窗口里
+    for i, (_, _, old_i, _) in enumerate(spans):
+        n = len(old_i) - 1
+        for start, end, _, new_j in spans[:i]:
+            if old_i in content[max(0, start - n):start] + new_j + content[end:end + n]:
+                return None
+    return [(start, end, new_text) for start, end, _, new_text in ordered]
+
+
 @register(multi_edit_schema)
-def multi_edit(filename: str, edits: list, allow_partial: bool = False):
+def multi_edit(filename: str, edits: list, allow_partial: bool = False, include_diff: bool = True):
     """批量编辑：在一个文件中执行多处 find & replace"""
     try:
         file_obj, err = guard_path(filename, must_exist=True, for_write=True)
@@ -279,44 +371,58 @@ def multi_edit(filename: str, edits: list, allow_partial: bool = False):
         def _apply_once(content, old_text, new_text):
             if old_text == "":
                 return None, "old_text 不能为空"
-            count = content.count(old_text)
+            idx, count = _find_unique(content, old_text)
             if count == 0:
                 return None, "未找到匹配文本"
             if count > 1:
                 return None, f"找到 {count} 处匹配，请提供更长上下文"
-            return content.replace(old_text, new_text, 1), None
+            return content[:idx] + new_text + content[idx + len(old_text):], None
 
         content = original_content
         applied = 0
         errors = []
 
-        for i, edit in enumerate(edits):
-            old_text = edit.get("old_text", "")
-            new_text = edit.get("new_text", "")
-            updated, apply_err = _apply_once(content, old_text, new_text)
-            if apply_err:
-                msg = f"编辑#{i+1}: {apply_err}"
-                if allow_partial:
-                    errors.append(msg)
-                    continue
-                return f"❌ 批量编辑中止（事务模式）：{msg}。未写入任何变更。"
-
-            content = updated
-            applied += 1
+        plan = _plan_edits(original_content, edits)
+        if plan is not None:
+            # 各项互不影响：按位置拼接一次成文，避免每项都复制整份文本
+            parts = []
+            pos = 0
+            for start, end, new_text in plan:
+                parts.append(original_content[pos:start])
+                parts.append(new_text)
+                pos = end
+            parts.append(original_content[pos:])
+            content = "".join(parts)
+            applied = len(plan)
+        else:
+            for i, edit in enumerate(edits):
+                old_text = edit.get("old_text", "")
+                new_text = edit.get("new_text", "")
+                updated, apply_err = _apply_once(content, old_text, new_text)
+                if apply_err:
+                    msg = f"编辑#{i+1}: {apply_err}"
+                    if allow_partial:
+                        errors.append(msg)
+                        continue
+                    return f"❌ 批量编辑中止（事务模式）：{msg}。未写入任何变更。"
+
+                content = updated
+                applied += 1
 
         if applied == 0:
             return "⚠️ 没有可应用的编辑，文件未修改。"
+        if content == original_content:
+            return f"ℹ️ {applied}/{len(edits)} 项编辑后内容无变更，未写入文件 '{_display_path(file_obj)}'。"
 
-        create_backup(file_obj)
-        with open(file_obj, 'w', encoding='utf-8') as f:
-            f.write(content)
+        create_backup_async(file_obj)
+        _write_text(file_obj, content)
 
-        diff_text = generate_diff(original_content, content, _display_path(file_obj))
+        diff_block = _diff_block(original_content, content, _display_path(file_obj), include_diff)
         result = f"✅ 批量编辑 '{_display_path(file_obj)}': {applied}/{len(edits)} 项成功。"
         if errors:
             result += "\n⚠️ 跳过: " + "; ".join(errors)
-        if diff_text:
-            result += f"\n```diff\n{diff_text}```"
+        if diff_block:
+            result += f"\n{diff_block}"
         return result
 
     except Exception as e:
@@ -3,10 +3,31 @@
 
 import os
 import json
+import threading
 import urllib.request
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from .registry import register
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _jdumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _jloads(raw: bytes):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode("utf-8"))
+
+
 # ==========================================
 # AI 提供商配置 (可在 .env 中扩展)
 # ==========================================
@@ -71,16 +92,26 @@ AI_PROVIDERS = {
 
 
 def _resolve_provider(provider: str):
-    if provider not in AI_PROVIDERS:
+    config = AI_PROVIDERS.get(provider)
+    if config is None:
         return None, f"❌ 未知的 AI 提供商: {provider}。可选: {', '.join(AI_PROVIDERS.keys())}"
+    # 环境变量的原值进入缓存 key，.env 重新加载后自动按新值解析
+    return _resolve_provider_cached(
+        provider,
+        os.getenv(config["api_key_env"], ""),
+        os.getenv(config.get("base_url_env", ""), ""),
+    )
 
+
+@lru_cache(maxsize=None)
+def _resolve_provider_cached(provider: str, api_key_raw: str, env_base_raw: str):
+    """Build the resolved config once per (provider, env values); the dict is shared, treat it as read-only."""
     config = dict(AI_PROVIDERS[provider])
-    api_key = os.getenv(config["api_key_env"], "").strip()
+    api_key = api_key_raw.strip()
     if not api_key:
         return None, f"❌ 缺少 API Key: 请在 .env 中配置 {config['api_key_env']}"
 
-    env_base = os.getenv(config.get("base_url_env", ""), "").strip()
-    base_url = env_base or config.get("base_url", "")
+    base_url = env_base_raw.strip() or config.get("base_url", "")
     if not base_url:
         return None, (
             f"❌ {provider} 缺少 BASE_URL。请在 .env 中配置 {config.get('base_url_env', 'BASE_URL')}"
@@ -101,13 +132,30 @@ def _format_usage(usage: dict):
     )
 
 
-def _call_openai_compatible(config, model, messages, temperature, max_tokens):
+# (api_key, base_url) -> OpenAI 客户端；复用其内部的 httpx 连接池，避免每次调用重新握手 TLS
+_CLIENT_CACHE = {}
+_CLIENT_LOCK = threading.Lock()
+
+
+def _get_openai_client(config):
+    key = (config["api_key"], config["resolved_base_url"])
+    client = _CLIENT_CACHE.get(key)
+    if client is not None:
+        return client
     try:
         from openai import OpenAI
     except ImportError:
         raise RuntimeError("缺少依赖 openai。请安装: pip install openai")
+    with _CLIENT_LOCK:
+        client = _CLIENT_CACHE.get(key)
+        if client is None:
+            client = OpenAI(api_key=key[0], base_url=key[1])
+            _CLIENT_CACHE[key] = client
+    return client
 
-    client = OpenAI(api_key=config["api_key"], base_url=config["resolved_base_url"])
+
+def _call_openai_compatible(config, model, messages, temperature, max_tokens):
+    client = _get_openai_client(config)
     response = client.chat.completions.create(
         model=model,
         messages=messages,
@@ -125,6 +173,21 @@ def _call_openai_compatible(config, model, messages, temperature, max_tokens):
     return response.choices[0].message.content or "", usage
 
 
+_ANTHROPIC_VERSION = "2023-06-01"
+# 复用的 httpx 连接池（openai SDK 的依赖，通常已安装）；未安装时退回 urllib
+_HTTP_CLIENT = None
+
+
+def _get_http_client():
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        import httpx
+        with _CLIENT_LOCK:
+            if _HTTP_CLIENT is None:
+                _HTTP_CLIENT = httpx.Client(timeout=30, headers={"anthropic-version": _ANTHROPIC_VERSION})
+    return _HTTP_CLIENT
+
+
 def _call_anthropic_messages(config, model, prompt, system_prompt, temperature, max_tokens):
     url = f"{config['resolved_base_url']}/messages"
     payload = {
@@ -136,18 +199,32 @@ def _call_anthropic_messages(config, model, prompt, system_prompt, temperature,
     if system_prompt:
         payload["system"] = system_prompt
 
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(payload).encode("utf-8"),
-        headers={
-            "x-api-key": config["api_key"],
-            "anthropic-version": "2023-06-01",
-            "content-type": "application/json",
-        },
-    )
+    try:
+        client = _get_http_client()
+    except ImportError:
+        client = None
 
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        data = json.loads(resp.read().decode("utf-8"))
+    if client is not None:
+        resp = client.post(
+            url,
+            content=_jdumps(payload),
+            headers={"x-api-key": config["api_key"], "content-type": "application/json"},
+        )
+        if resp.is_error:
+            raise RuntimeError(f"HTTP {resp.status_code} - {resp.reason_phrase}")
+        data = _jloads(resp.content)
+    else:
+        req = urllib.request.Request(
+            url,
+            data=_jdumps(payload),
+            headers={
+                "x-api-key": config["api_key"],
+                "anthropic-version": _ANTHROPIC_VERSION,
+                "content-type": "application/json",
+            },
+        )
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            data = _jloads(resp.read())
 
     content_parts = []
     for item in data.get("content", []):
@@ -193,6 +270,36 @@ call_ai_schema = {
 }
 
 
+def _complete(config, model, prompt, system_prompt, temperature, max_tokens):
+    """Send one prompt through the provider's adapter; returns (content, usage)."""
+    if config.get("adapter", "openai_compatible") == "anthropic_messages":
+        return _call_anthropic_messages(
+            config=config,
+            model=model,
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+    return _call_openai_compatible(
+        config=config,
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+    )
+
+
+def _format_error(provider, e):
+    if isinstance(e, urllib.error.HTTPError):
+        return f"❌ AI 调用失败 ({provider}): HTTP {e.code} - {e.reason}"
+    return f"❌ AI 调用失败 ({provider}): {e}"
+
+
 @register(call_ai_schema)
 def call_ai(
     prompt: str,
@@ -210,35 +317,55 @@ def call_ai(
             return err
 
         model = model or config["default_model"]
-        adapter = config.get("adapter", "openai_compatible")
-
-        if adapter == "anthropic_messages":
-            content, usage = _call_anthropic_messages(
-                config=config,
-                model=model,
-                prompt=prompt,
-                system_prompt=system_prompt,
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
-        else:
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": prompt})
-            content, usage = _call_openai_compatible(
-                config=config,
-                model=model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
+        content, usage = _complete(config, model, prompt, system_prompt, temperature, max_tokens)
+        return f"🤖 [{provider}/{model}] 回复:\n\n{content}{_format_usage(usage)}"
+    except Exception as e:
+        return _format_error(provider, e)
+
+
+def call_ai_batch(
+    prompts,
+    provider: str = "kimi",
+    model: str = "",
+    system_prompt: str = "",
+    temperature: float = 0.7,
+    max_tokens: int = 4096,
+    max_workers: int = 8,
+    sep: str = "\n\n",
+):
+    """Send independent prompts concurrently and merge the replies, in prompt order, into one call_ai-style result.
+
+    Replies are joined with sep and token usage is summed; any failed request fails the whole batch.
+    """
+    try:
+        provider = provider.lower().strip()
+        config, err = _resolve_provider(provider)
+        if err:
+            return err
+
+        model = model or config["default_model"]
+        prompts = list(prompts)
 
+        def call(p):
+            return _complete(config, model, p, system_prompt, temperature, max_tokens)
+
+        if len(prompts) <= 1:
+            results = [call(p) for p in prompts]
+        else:
+            # 请求基本都在等网络，线程并发把总耗时从各次之和压到最慢的一次；客户端已按 key 复用
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(prompts))) as ex:
+                results = list(ex.map(call, prompts))
+
+        usage = None
+        for _, part in results:
+            if part:
+                usage = usage or {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+                for k in usage:
+                    usage[k] += part.get(k) or 0
+        content = sep.join(c for c, _ in results)
         return f"🤖 [{provider}/{model}] 回复:\n\n{content}{_format_usage(usage)}"
-    except urllib.error.HTTPError as e:
-        return f"❌ AI 调用失败 ({provider}): HTTP {e.code} - {e.reason}"
     except Exception as e:
-        return f"❌ AI 调用失败 ({provider}): {e}"
+        return _format_error(provider, e)
 
 
 # ==========================================
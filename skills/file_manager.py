@@ -2,7 +2,9 @@
 # 文件管理工具：create_file, delete_file, copy_file, rename_file, get_file_info
 
 import os
+import errno
 import shutil
+import stat
 import time
 from .registry import register
 from .path_safety import guard_path, WORKSPACE_ROOT
@@ -88,16 +90,21 @@ delete_file_schema = {
 @register(delete_file_schema)
 def delete_file(filepath: str, recursive: bool = False):
     try:
-        path_obj, err = guard_path(filepath, must_exist=True, for_write=True)
+        path_obj, err = guard_path(filepath, must_exist=False, for_write=True)
         if err:
             return err
 
-        if path_obj.is_file():
-            size = path_obj.stat().st_size
+        # 一次 stat 同时得到存在性、类型和大小
+        try:
+            st = os.stat(path_obj)
+        except FileNotFoundError:
+            return f"❌ 路径不存在: {path_obj}"
+
+        if stat.S_ISREG(st.st_mode):
             path_obj.unlink()
-            return f"✅ 已删除文件: {_display_path(path_obj)} ({size} 字节)"
+            return f"✅ 已删除文件: {_display_path(path_obj)} ({st.st_size} 字节)"
 
-        if path_obj.is_dir():
+        if stat.S_ISDIR(st.st_mode):
             if recursive:
                 item_count = sum(len(files) for _, _, files in os.walk(path_obj))
                 shutil.rmtree(path_obj)
@@ -133,6 +140,79 @@ copy_file_schema = {
 }
 
 
+_O_BINARY = getattr(os, "O_BINARY", 0)
+_COPY_BUFSIZE = 1 << 20
+_SENDFILE_CHUNK = 8 << 20
+# 这些错误表示当前文件系统 / 内核不支持该零拷贝方式，换下一种
+_FASTCOPY_FALLBACK_ERRNOS = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.ENOTSUP, errno.EOPNOTSUPP, errno.ETXTBSY}
+
+
+def _fastcopy(src_fd, dst_fd, size):
+    """从 src_fd 的当前位置拷到 dst_fd：copy_file_range → sendfile → 1 MiB 缓冲循环，返回拷贝的字节数。
+
+    两个 fd 的偏移随拷贝推进，所以某种方式中途失败后下一种会接着往下拷。
+    第一次调用就返回 0 时（procfs/sysfs、部分 FUSE 和跨设备场景什么都没拷）
+    也换下一种，与 shutil 的做法一致。
+    """
+    chunk = max(size, _SENDFILE_CHUNK)
+    total = 0
+    if hasattr(os, "copy_file_range"):
+        # CoW 文件系统 (btrfs/xfs) 上直接共享数据块，NFS 上由服务端完成拷贝
+        try:
+            n = os.copy_file_range(src_fd, dst_fd, chunk)
+            if n:
+                while n:
+                    total += n
+                    n = os.copy_file_range(src_fd, dst_fd, chunk)
+                return total
+        except OSError as e:
+            if e.errno not in _FASTCOPY_FALLBACK_ERRNOS:
+                raise
+    if hasattr(os, "sendfile"):
+        try:
+            n = os.sendfile(dst_fd, src_fd, None, _SENDFILE_CHUNK)
+            if n:
+                while n:
+                    total += n
+                    n = os.sendfile(dst_fd, src_fd, None, _SENDFILE_CHUNK)
+                return total
+        except OSError as e:
+            if e.errno not in _FASTCOPY_FALLBACK_ERRNOS:
+                raise
+    buf = bytearray(_COPY_BUFSIZE)
+    view = memoryview(buf)
+    with open(src_fd, 'rb', buffering=0, closefd=False) as src:
+        while True:
+            n = src.readinto(buf)
+            if not n:
+                return total
+            written = 0
+            while written < n:
+                written += os.write(dst_fd, view[written:n])
+            total += n
+
+
+def _copy_regular_file(source_obj, destination_obj):
+    """复制单个文件并保留元数据，返回字节数；目标已存在时抛 FileExistsError。"""
+    src_fd = os.open(source_obj, os.O_RDONLY | _O_BINARY)
+    try:
+        st = os.fstat(src_fd)
+        dst_fd = os.open(destination_obj, os.O_WRONLY | os.O_CREAT | os.O_EXCL | _O_BINARY, st.st_mode & 0o777)
+        try:
+            copied = _fastcopy(src_fd, dst_fd, st.st_size)
+            if copied != st.st_size:
+                raise OSError(errno.EIO, f"复制不完整: 已拷贝 {copied} / {st.st_size} 字节", str(source_obj))
+        except BaseException:
+            os.close(dst_fd)
+            os.unlink(destination_obj)
+            raise
+        os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    shutil.copystat(source_obj, destination_obj)
+    return copied
+
+
 @register(copy_file_schema)
 def copy_file(source: str, destination: str):
     try:
@@ -151,8 +231,7 @@ def copy_file(source: str, destination: str):
             destination_obj.parent.mkdir(parents=True, exist_ok=True)
 
         if source_obj.is_file():
-            shutil.copy2(source_obj, destination_obj)
-            size = destination_obj.stat().st_size
+            size = _copy_regular_file(source_obj, destination_obj)
             return f"✅ 已复制文件: {_display_path(source_obj)} → {_display_path(destination_obj)} ({size} 字节)"
         elif source_obj.is_dir():
             shutil.copytree(source_obj, destination_obj)
@@ -228,20 +307,25 @@ get_file_info_schema = {
 @register(get_file_info_schema)
 def get_file_info(filepath: str):
     try:
-        path_obj, err = guard_path(filepath, must_exist=True, for_write=False)
+        path_obj, err = guard_path(filepath, must_exist=False, for_write=False)
         if err:
             return err
 
-        stat = path_obj.stat()
+        # 一次 stat 取代 stat + is_dir + is_file 三次探测
+        try:
+            st = os.stat(path_obj)
+        except FileNotFoundError:
+            return f"❌ 路径不存在: {path_obj}"
+        is_dir = stat.S_ISDIR(st.st_mode)
         info = {
             "路径": str(path_obj),
-            "类型": "目录" if path_obj.is_dir() else "文件",
-            "大小": _format_size(stat.st_size),
-            "修改时间": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stat.st_mtime)),
-            "创建时间": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stat.st_ctime)),
+            "类型": "目录" if is_dir else "文件",
+            "大小": _format_size(st.st_size),
+            "修改时间": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(st.st_mtime)),
+            "创建时间": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(st.st_ctime)),
         }
 
-        if path_obj.is_file():
+        if stat.S_ISREG(st.st_mode):
             ext = path_obj.suffix.lower()
             info["扩展名"] = ext or "(无)"
 
@@ -253,7 +337,7 @@ def get_file_info(filepath: str):
             except (UnicodeDecodeError, PermissionError):
                 info["行数"] = "(二进制或不可读)"
 
-        elif path_obj.is_dir():
+        elif is_dir:
             file_count = 0
             dir_count = 0
             total_size = 0
@@ -55,19 +55,20 @@ def move_file_by_ext(extension: str, target_folder: str, source_folder: str = ".
 
         moved = 0
         skipped = 0
-        for item in source_obj.iterdir():
-            if not item.is_file():
-                continue
-            if item.suffix.lower() != f".{extension}":
-                continue
+        suffix = f".{extension}"
+        # scandir 的 DirEntry 自带文件类型，先按后缀过滤，不必逐个 stat
+        with os.scandir(source_obj) as it:
+            for entry in it:
+                if os.path.splitext(entry.name)[1].lower() != suffix or not entry.is_file():
+                    continue
 
-            dst = target_obj / item.name
-            if dst.exists():
-                skipped += 1
-                continue
+                dst = target_obj / entry.name
+                if dst.exists():
+                    skipped += 1
+                    continue
 
-            shutil.move(str(item), str(dst))
-            moved += 1
+                shutil.move(entry.path, str(dst))
+                moved += 1
 
         return (
             f"✅ 已移动 {moved} 个 .{extension} 文件"
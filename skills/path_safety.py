@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -67,3 +68,13 @@ def guard_path(path_value: str, must_exist: bool = False, for_write: bool = Fals
         return None, f"❌ 拒绝访问：禁止修改核心文件 '{path_obj.name}'。"
 
     return path_obj, None
+
+
+@lru_cache(maxsize=None)
+def guard_path_cached(path_value: str, for_write: bool = False):
+    """guard_path for fixed internal paths (audit log, backup dir, data dir).
+
+    The result only depends on the path string and workspace root, so it is
+    resolved once per process. No existence check: callers create on demand.
+    """
+    return guard_path(path_value, must_exist=False, for_write=for_write)
@@ -0,0 +1,42 @@
+# tests/conftest.py
+# 所有测试共用一个临时工作区：WORKSPACE_ROOT 在 skills 导入时确定，必须先设环境变量
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+_WORKSPACE = tempfile.mkdtemp(prefix="ai-agent-tests-")
+os.environ["AI_AGENT_WORKSPACE_ROOT"] = _WORKSPACE
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from skills import audit_tools, backup_tools, daily_tools  # noqa: E402
+
+
+def _reset_state():
+    backup_tools.flush_backups()
+    audit_tools.flush_audit()
+    audit_tools._close_audit_fh()
+    backup_tools._index_cache.update(sig=None, index={}, lines=0)
+    daily_tools._REM_CACHE.update(sig=None, data=None, dirty=False)
+
+
+@pytest.fixture(autouse=True)
+def workspace():
+    """Give each test an empty workspace with fresh module caches."""
+    root = Path(_WORKSPACE)
+    _reset_state()
+    for child in root.iterdir():
+        if child.is_dir():
+            shutil.rmtree(child)
+        else:
+            child.unlink()
+    yield root
+    _reset_state()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_WORKSPACE, ignore_errors=True)
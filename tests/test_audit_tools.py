@@ -0,0 +1,47 @@
+import json
+import time
+
+from skills import audit_tools
+
+
+def test_query_sees_record_without_explicit_flush(workspace):
+    audit_tools.log_tool_call("read_file", {"path": "a.txt"}, "ok", 12.5)
+
+    # audit_query 自己要先等后台写线程落盘
+    result = audit_tools.audit_query(tool_name="read_file")
+
+    assert "read_file" in result
+    assert "path=a.txt" in result
+
+
+def test_records_go_to_daily_shard(workspace):
+    audit_tools.log_tool_call("list_dir", {}, "ok")
+    audit_tools.flush_audit()
+
+    shard = workspace / "data" / "audit" / f"{time.strftime('%Y-%m-%d')}.jsonl"
+    records = [json.loads(line) for line in shard.read_text(encoding="utf-8").splitlines()]
+    assert [r["tool"] for r in records] == ["list_dir"]
+    assert records[0]["ts"].startswith(time.strftime("%Y-%m-%d"))
+
+
+def test_legacy_log_is_still_read_alongside_shards(workspace):
+    legacy = workspace / "data" / "audit_log.jsonl"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_text(json.dumps({
+        "ts": "2024-01-02 03:04:05",
+        "epoch": 1704164645.0,
+        "tool": "legacy_tool",
+        "args_summary": {},
+        "result_preview": "❌ failed",
+        "success": False,
+        "elapsed_ms": 1.0,
+    }) + "\n", encoding="utf-8")
+    audit_tools.log_tool_call("new_tool", {}, "ok")
+
+    result = audit_tools.audit_query(last_n=10)
+    assert "legacy_tool" in result
+    assert "new_tool" in result
+
+    errors = audit_tools.audit_query(only_errors=True)
+    assert "legacy_tool" in errors
+    assert "new_tool" not in errors
@@ -0,0 +1,60 @@
+import json
+
+from skills import backup_tools
+
+
+def _write_legacy_backup(workspace, name, content, stamp):
+    backup_dir = workspace / "data" / "backups"
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    backup_name = f"{name}.{stamp}.bak"
+    (backup_dir / backup_name).write_text(content, encoding="utf-8")
+    return {
+        "backup_file": backup_name,
+        "timestamp": stamp,
+        "size": len(content),
+        "created_at": "2024-01-02 03:04:05",
+    }
+
+
+def test_legacy_json_index_migrates_to_jsonl(workspace):
+    target = workspace / "notes.txt"
+    target.write_text("current", encoding="utf-8")
+    key = backup_tools._file_key(target)
+    entries = [
+        _write_legacy_backup(workspace, "notes.txt", "first", "20240102_030405"),
+        _write_legacy_backup(workspace, "notes.txt", "second", "20240102_030406"),
+    ]
+    legacy = workspace / "data" / "backups" / "_index.json"
+    legacy.write_text(json.dumps({key: entries}), encoding="utf-8")
+
+    history = backup_tools.backup_history("notes.txt")
+    assert "2 个版本" in history
+
+    jsonl = workspace / "data" / "backups" / "_index.jsonl"
+    records = [json.loads(line) for line in jsonl.read_text(encoding="utf-8").splitlines()]
+    assert records == [{"key": key, "entries": entries}]
+
+    # 迁移后的索引可以正常恢复，恢复前的版本也会追加进索引
+    assert backup_tools.undo_edit("notes.txt", version=2).startswith("✅")
+    assert target.read_text(encoding="utf-8") == "first"
+    backup_tools._index_cache.update(sig=None, index={}, lines=0)
+    assert len(backup_tools._load_index()[key]) == 3
+
+
+def test_async_backups_keep_order_and_clean_keeps_latest(workspace):
+    target = workspace / "a.txt"
+    for i in range(5):
+        target.write_text(f"v{i}", encoding="utf-8")
+        assert backup_tools.create_backup_async(target)
+    backup_tools.flush_backups()
+
+    key = backup_tools._file_key(target)
+    entries = backup_tools._load_index()[key]
+    backup_dir = workspace / "data" / "backups"
+    assert [(backup_dir / e["backup_file"]).read_text(encoding="utf-8") for e in entries] == [
+        "v0", "v1", "v2", "v3", "v4"
+    ]
+
+    assert backup_tools.backup_clean("a.txt", keep=2).startswith("✅")
+    entries = backup_tools._load_index()[key]
+    assert [(backup_dir / e["backup_file"]).read_text(encoding="utf-8") for e in entries] == ["v3", "v4"]
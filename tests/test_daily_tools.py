@@ -0,0 +1,67 @@
+import json
+
+from skills import daily_tools
+
+
+def _read_reminders(workspace):
+    return json.loads((workspace / "data" / "reminders.json").read_text(encoding="utf-8"))
+
+
+def test_legacy_reminders_gain_remind_ts_on_next_write(workspace):
+    path = workspace / "data" / "reminders.json"
+    path.parent.mkdir(parents=True)
+    path.write_text(json.dumps([
+        {"id": 1, "content": "past", "remind_time": "2020-01-01 09:00",
+         "created": "2019-12-31 09:00", "triggered": False},
+        {"id": 2, "content": "future", "remind_time": "2099-01-01 09:00",
+         "created": "2019-12-31 09:00", "triggered": False},
+        {"id": 3, "content": "broken", "remind_time": "not a time",
+         "created": "2019-12-31 09:00", "triggered": False},
+    ], ensure_ascii=False), encoding="utf-8")
+
+    listing = daily_tools.reminder_manage("list")
+    assert listing.index("#1") < listing.index("#2") < listing.index("#3")
+
+    result = daily_tools.reminder_manage("check")
+    assert "#1 past" in result
+    assert "future" not in result and "broken" not in result
+
+    saved = {r["id"]: r for r in _read_reminders(workspace)}
+    assert saved[1]["triggered"] is True
+    assert saved[1]["remind_ts"] == daily_tools._remind_ts("2020-01-01 09:00")
+    assert saved[2]["remind_ts"] == daily_tools._remind_ts("2099-01-01 09:00")
+    assert "remind_ts" not in saved[3]
+
+
+def test_reminder_changes_reach_disk_before_the_call_returns(workspace):
+    daily_tools.reminder_manage("add", content="a", remind_time="2099-01-01 09:00")
+    assert [r["content"] for r in _read_reminders(workspace)] == ["a"]
+
+    daily_tools.reminder_manage("delete", reminder_id=1)
+    assert _read_reminders(workspace) == []
+
+
+def test_external_reminder_write_is_not_overwritten(workspace):
+    daily_tools.reminder_manage("add", content="ours", remind_time="2099-01-01 09:00")
+    path = workspace / "data" / "reminders.json"
+    data = _read_reminders(workspace)
+    data.append({"id": 7, "content": "theirs", "remind_time": "2099-02-01 09:00", "triggered": False})
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    daily_tools.reminder_manage("add", content="more", remind_time="2099-03-01 09:00")
+
+    assert [r["content"] for r in _read_reminders(workspace)] == ["ours", "theirs", "more"]
+
+
+def test_note_append_follows_a_replaced_file(workspace):
+    assert daily_tools.note_manage("create", title="n", content="body").startswith("✅")
+    path = workspace / "data" / "notes" / "n.md"
+    replacement = path.with_name("n.md.new")
+    replacement.write_text("replaced", encoding="utf-8")
+    replacement.replace(path)
+
+    daily_tools.note_manage("append", title="n", content="tail")
+
+    text = path.read_text(encoding="utf-8")
+    assert text.startswith("replaced")
+    assert text.endswith("tail")
@@ -0,0 +1,80 @@
+import os
+import stat
+
+from skills import backup_tools, edit_tools
+
+
+def test_edit_file_replaces_atomically_and_keeps_mode(workspace):
+    target = workspace / "run.sh"
+    target.write_text("echo old\n", encoding="utf-8")
+    os.chmod(target, 0o755)
+    # 同名 .tmp 是用户自己的文件，原子写入不能覆盖它
+    user_tmp = workspace / "run.sh.tmp"
+    user_tmp.write_text("keep me", encoding="utf-8")
+
+    result = edit_tools.edit_file("run.sh", "old", "new", include_diff=False)
+
+    assert result.startswith("✅")
+    assert target.read_text(encoding="utf-8") == "echo new\n"
+    assert stat.S_IMODE(target.stat().st_mode) == 0o755
+    assert user_tmp.read_text(encoding="utf-8") == "keep me"
+    assert sorted(p.name for p in workspace.iterdir() if p.is_file()) == ["run.sh", "run.sh.tmp"]
+
+
+def test_noop_edit_does_not_write_or_back_up(workspace):
+    target = workspace / "same.txt"
+    target.write_text("abc", encoding="utf-8")
+    before = target.stat().st_mtime_ns
+
+    result = edit_tools.edit_file("same.txt", "b", "b")
+
+    assert result.startswith("ℹ️")
+    assert target.stat().st_mtime_ns == before
+    backup_tools.flush_backups()
+    assert backup_tools._file_key(target) not in backup_tools._load_index()
+
+
+def test_plan_edits_rejects_overlapping_and_adjacent_spans():
+    content = "alpha beta gamma delta"
+    assert edit_tools._plan_edits(content, [
+        {"old_text": "alpha beta", "new_text": "x"},
+        {"old_text": "beta gamma", "new_text": "y"},
+    ]) is None
+    # 间距小于最长 old_text 时也交给逐项替换
+    assert edit_tools._plan_edits(content, [
+        {"old_text": "alpha", "new_text": "x"},
+        {"old_text": "beta", "new_text": "y"},
+    ]) is None
+
+    far = "alpha" + "." * 20 + "omega"
+    assert edit_tools._plan_edits(far, [
+        {"old_text": "omega", "new_text": "O"},
+        {"old_text": "alpha", "new_text": "A"},
+    ]) == [(0, 5, "A"), (25, 30, "O")]
+
+
+def test_multi_edit_matches_sequential_semantics_when_edits_interact(workspace):
+    target = workspace / "seq.txt"
+    target.write_text("foo bar", encoding="utf-8")
+
+    # 第二项匹配的是第一项改出来的文本
+    result = edit_tools.multi_edit("seq.txt", [
+        {"old_text": "foo", "new_text": "baz"},
+        {"old_text": "baz bar", "new_text": "done"},
+    ], include_diff=False)
+
+    assert result.startswith("✅")
+    assert target.read_text(encoding="utf-8") == "done"
+
+
+def test_multi_edit_is_transactional(workspace):
+    target = workspace / "tx.txt"
+    target.write_text("one two three", encoding="utf-8")
+
+    result = edit_tools.multi_edit("tx.txt", [
+        {"old_text": "one", "new_text": "1"},
+        {"old_text": "missing", "new_text": "?"},
+    ])
+
+    assert result.startswith("❌")
+    assert target.read_text(encoding="utf-8") == "one two three"